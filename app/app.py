@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
 
+from data import (
+    CRYPTO_PAIRS,
+    get_all_gateio_tickers,
+    get_gateio_data,
+    fetch_gateio_klines,
+    clear_market_data_cache
+)
+
 st.set_page_config(
     page_title="Gate.io Crypto Analysis",
     page_icon="📊",
@@ -21,89 +29,28 @@ if 'crypto_data' not in st.session_state:
 if 'historical_data' not in st.session_state:
     st.session_state.historical_data = {}
 
-CRYPTO_PAIRS = ['DOGE_USDT', 'LINK_USDT', 'SEI_USDT', 'ALCH_USDT', 'GIGGLE_USDT', 'COAI_USDT', 'FARTCOIN_USDT']
-
-@st.cache_data(ttl=60)
-def get_gateio_data(symbol):
-    """Получение реальных данных с Gate.io API"""
-    try:
-        url = f"https://api.gateio.ws/api/v4/spot/tickers?currency_pair={symbol}"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data and len(data) > 0:
-                ticker = data[0]
-                return {
-                    'symbol': symbol,
-                    'last': float(ticker['last']),
-                    'change_percentage': float(ticker['change_percentage']),
-                    'high_24h': float(ticker['high_24h']),
-                    'low_24h': float(ticker['low_24h']),
-                    'quote_volume': float(ticker['quote_volume']),
-                    'base_volume': float(ticker['base_volume']),
-                    'source': 'Gate.io',
-                    'available': True
-                }
-    except Exception as e:
-        st.error(f"Ошибка получения данных для {symbol}: {str(e)}")
-    
-    return {
-        'symbol': symbol,
-        'last': 0,
-        'change_percentage': 0,
-        'high_24h': 0,
-        'low_24h': 0,
-        'quote_volume': 0,
-        'source': 'Не доступно',
-        'available': False
-    }
-
-@st.cache_data(ttl=60)
-def fetch_gateio_klines(symbol, period='15m', limit=192):
-    """Получение исторических данных с Gate.io API (48 часов = 192 * 15 минут)"""
-    try:
-        url = f"https://api.gateio.ws/api/v4/spot/candlesticks"
-        params = {
-            'currency_pair': symbol,
-            'limit': limit,
-            'interval': period
-        }
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if isinstance(data, list) and len(data) > 0:
-                # Gate.io возвращает 8 колонок, берем первые 6
-                df = pd.DataFrame(data)
-                df = df.iloc[:, :6]
-                df.columns = ['timestamp', 'volume', 'close', 'high', 'low', 'open']
-                
-                # Конвертируем типы данных
-                numeric_cols = ['open', 'high', 'low', 'close', 'volume']
-                for col in numeric_cols:
-                    df[col] = pd.to_numeric(df[col])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-                return df.sort_values('timestamp')
-    except Exception as e:
-        st.error(f"Ошибка получения исторических данных для {symbol}: {e}")
-    return None
-
 def create_gateio_style_chart(df, symbol, current_data):
     """Создание графика в стиле Gate.io"""
     if df is None or len(df) == 0:
         return None
     
+    # Перестраиваем фигуру только при появлении новой свечи или изменении последней:
+    # у текущей свечи меняются не только close, но и high/low (тени)
+    last = df.iloc[-1]
+    key = (symbol, int(last['timestamp'].value), float(last['close']), float(last['high']), float(last['low']))
+    if st.session_state.get(f"candle_key_{symbol}") == key:
+        return st.session_state[f"candle_{symbol}"]
+    
     # Основной свечной график
     fig = go.Figure()
     
-    # Добавляем свечи
+    # Добавляем свечи (float32 вдвое сокращает объем данных, отправляемых в браузер)
     fig.add_trace(go.Candlestick(
-        x=df['timestamp'],
-        open=df['open'],
-        high=df['high'],
-        low=df['low'],
-        close=df['close'],
+        x=df['timestamp'].to_numpy(),
+        open=df['open'].to_numpy(dtype=np.float32),
+        high=df['high'].to_numpy(dtype=np.float32),
+        low=df['low'].to_numpy(dtype=np.float32),
+        close=df['close'].to_numpy(dtype=np.float32),
         name='Price'
     ))
     
@@ -129,8 +76,44 @@ def create_gateio_style_chart(df, symbol, current_data):
         )
     )
     
+    st.session_state[f"candle_key_{symbol}"] = key
+    st.session_state[f"candle_{symbol}"] = fig
+    return fig
+
+def create_fallback_chart(symbol, current_data):
+    """Примерный график на основе текущей цены, когда исторические данные недоступны"""
+    # Перестраиваем фигуру при изменении цены или с началом новой 15-минутной свечи,
+    # чтобы ось времени не отставала; иначе берем из session_state
+    key = (symbol, current_data['last'], current_data['change_percentage'], int(time.time() // 900))
+    if st.session_state.get(f"fig_key_{symbol}") == key:
+        return st.session_state[f"fig_{symbol}"]
+    
+    dates = np.datetime64(datetime.now(), 's') - np.arange(49, -1, -1) * np.timedelta64(15, 'm')
+    prices = current_data['last'] * (1 + np.linspace(-0.025, 0.024, 50))
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=prices, mode='lines', name='Price'))
+    fig.update_layout(title='Примерный график (данные временно недоступны)', height=400)
+    
+    st.session_state[f"fig_key_{symbol}"] = key
+    st.session_state[f"fig_{symbol}"] = fig
     return fig
 
+@st.fragment(run_every=10)
+def auto_refresh_timer():
+    """Таймер автообновления: перерисовывается сам, а раз в 60 секунд перезапускает страницу"""
+    current_time = time.time()
+    time_since_update = current_time - st.session_state.last_update
+    time_remaining = max(0, 60 - time_since_update)
+    
+    st.write(f"⏱️ Следующее обновление через: {int(time_remaining)} сек")
+    
+    if time_since_update > 60:
+        st.session_state.last_update = current_time
+        # Очищаем кэш рыночных данных для принудительного обновления
+        clear_market_data_cache()
+        st.rerun()
+
 def main_page():
     st.title("📊 Gate.io Crypto Analysis - Real-time Dashboard")
     
@@ -139,31 +122,29 @@ def main_page():
     
     # Таймер до следующего обновления
     if auto_refresh:
-        current_time = time.time()
-        time_since_update = current_time - st.session_state.last_update
-        time_remaining = max(0, 60 - time_since_update)
-        
-        st.sidebar.write(f"⏱️ Следующее обновление через: {int(time_remaining)} сек")
-        
-        if time_since_update > 60:
-            st.session_state.last_update = current_time
-            # Очищаем кэш для принудительного обновления данных
-            st.cache_data.clear()
-            st.rerun()
+        with st.sidebar:
+            auto_refresh_timer()
     
     # Получение данных для всех пар
     with st.spinner("🔄 Загрузка реальных данных с Gate.io..."):
+        # Тикеры и исторические данные запрашиваем параллельно через общую сессию
+        with ThreadPoolExecutor(max_workers=len(CRYPTO_PAIRS) + 1) as executor:
+            # Прогреваем кэш тикеров; ошибку покажет get_gateio_data при повторном вызове
+            executor.submit(get_all_gateio_tickers)
+            klines_futures = {
+                symbol: executor.submit(fetch_gateio_klines, symbol, '15m', 192) for symbol in CRYPTO_PAIRS
+            }
+        
+        # Ошибки загрузки свечей собираются здесь и выводятся в потоке скрипта
+        klines_errors = {}
         for symbol in CRYPTO_PAIRS:
-            # Получаем текущие данные
-            current_data = get_gateio_data(symbol)
-            # Получаем исторические данные
-            historical_data = fetch_gateio_klines(symbol, '15m', 192)
-            
-            st.session_state.crypto_data[symbol] = current_data
-            st.session_state.historical_data[symbol] = historical_data
-            
-            # Небольшая задержка между запросами чтобы не перегружать API
-            time.sleep(0.5)
+            # Текущие данные берутся из одного общего запроса тикеров всех пар
+            st.session_state.crypto_data[symbol] = get_gateio_data(symbol)
+            try:
+                st.session_state.historical_data[symbol] = klines_futures[symbol].result()
+            except Exception as e:
+                st.session_state.historical_data[symbol] = None
+                klines_errors[symbol] = f"Ошибка получения исторических данных для {symbol}: {e}"
     
     # Отображение данных
     for symbol in CRYPTO_PAIRS:
@@ -175,33 +156,22 @@ def main_page():
         
         if current_data and current_data['available']:
             # ОСНОВНЫЕ МЕТРИКИ
-            col1, col2, col3, col4, col5, col6 = st.columns(6)
+            quote_volume = current_data.get('quote_volume', 0)
+            change_text = f"{current_data['change_percentage']:.2f}%"
+            # Расчет открытого интереса (примерный)
+            oi_estimate = quote_volume * 0.15
             
-            with col1:
-                price_color = "green" if current_data['change_percentage'] >= 0 else "red"
-                st.metric(
-                    "Текущая цена", 
-                    f"${current_data['last']:.6f}",
-                    delta=f"{current_data['change_percentage']:.2f}%"
-                )
-            
-            with col2:
-                st.metric("Максимум 24ч", f"${current_data['high_24h']:.6f}")
-            
-            with col3:
-                st.metric("Минимум 24ч", f"${current_data['low_24h']:.6f}")
-            
-            with col4:
-                # Расчет открытого интереса (примерный)
-                oi_estimate = current_data.get('quote_volume', 0) * 0.15
-                st.metric("Открытый интерес", f"${oi_estimate:,.0f}")
-            
-            with col5:
-                change_display = f"{current_data['change_percentage']:.2f}%"
-                st.metric("Изменение 24ч", change_display)
-            
-            with col6:
-                st.metric("Объем 24ч", f"${current_data.get('quote_volume', 0):,.0f}")
+            # Метрики одной строкой колонок: (заголовок, значение, дельта)
+            metrics = (
+                ("Текущая цена", f"${current_data['last']:.6f}", change_text),
+                ("Максимум 24ч", f"${current_data['high_24h']:.6f}", None),
+                ("Минимум 24ч", f"${current_data['low_24h']:.6f}", None),
+                ("Открытый интерес", f"${oi_estimate:,.0f}", None),
+                ("Изменение 24ч", change_text, None),
+                ("Объем 24ч", f"${quote_volume:,.0f}", None)
+            )
+            for col, (label, value, delta) in zip(st.columns(len(metrics)), metrics):
+                col.metric(label, value, delta=delta)
             
             # ГРАФИК В СТИЛЕ GATE.IO
             if historical_data is not None and len(historical_data) > 0:
@@ -211,20 +181,18 @@ def main_page():
                 else:
                     st.error("Не удалось построить график")
             else:
+                if symbol in klines_errors:
+                    st.error(klines_errors[symbol])
                 st.warning("Исторические данные временно недоступны")
                 # Показываем простой график на основе текущей цены
-                dates = pd.date_range(end=datetime.now(), periods=50, freq='15min')
-                prices = [current_data['last'] * (1 + i * 0.001) for i in range(-25, 25)]
-                
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=dates, y=prices, mode='lines', name='Price'))
-                fig.update_layout(title='Примерный график (данные временно недоступны)', height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(create_fallback_chart(symbol, current_data), use_container_width=True)
             
             # СТАТУС ДАННЫХ
             st.info(f"📡 Источник данных: {current_data['source']} | 🕒 Таймфрейм: 15 минут | 📊 Период: 48 часов")
             
         else:
+            if current_data and current_data.get('error'):
+                st.error(current_data['error'])
             st.error("❌ Пара не торгуется на Gate.io или временно недоступна")
             st.info("Эта криптовалютная пара может не поддерживаться биржей Gate.io")
         
@@ -236,26 +204,13 @@ def main_page():
     
     if st.sidebar.button("🔄 Обновить сейчас"):
         st.session_state.last_update = 0
-        st.cache_data.clear()
+        clear_market_data_cache()
         st.rerun()
     
     # СТАТИСТИКА
     available_pairs = sum(1 for symbol in CRYPTO_PAIRS 
                          if st.session_state.crypto_data.get(symbol, {}).get('available', False))
     st.sidebar.markdown(f"**📈 Доступно пар:** {available_pairs}/{len(CRYPTO_PAIRS)}")
-    
-    # АВТООБНОВЛЕНИЕ ЧЕРЕЗ JAVASCRIPT (дополнительная опция)
-    if auto_refresh:
-        st.sidebar.markdown("""
-        <script>
-        function refreshPage() {
-            setTimeout(function() {
-                window.location.reload();
-            }, 60000);
-        }
-        refreshPage();
-        </script>
-        """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main_page()
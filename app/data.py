@@ -0,0 +1,247 @@
+# Общий слой данных Gate.io для всех страниц приложения
+import streamlit as st
+import pandas as pd
+import numpy as np
+import requests
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CRYPTO_PAIRS = ['DOGE_USDT', 'LINK_USDT', 'SEI_USDT', 'ALCH_USDT', 'GIGGLE_USDT', 'COAI_USDT', 'FARTCOIN_USDT']
+
+# Конфигурация Gate.io API
+GATEIO_BASE_URL = "https://api.gateio.ws/api/v4"
+
+# Отдельные таймауты на соединение и чтение ответа
+_TIMEOUT = (3, 7)
+
+# Общая HTTP-сессия: keep-alive соединения с Gate.io переиспользуются между запросами
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=20,
+    # Повторы с экспоненциальной задержкой при временных ошибках API
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset(["GET"])
+    )
+))
+_SESSION.headers.update({
+    "User-Agent": "crypto-dash/1.0",
+    "Accept": "application/json",
+    "Connection": "keep-alive"
+})
+
+# CryptoPanic жестко ограничивает частоту запросов: повтор на 429 только расходует лимит,
+# поэтому у новостей своя сессия, которая повторяет лишь ошибки шлюза
+_NEWS_SESSION = requests.Session()
+_NEWS_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET"])
+    )
+))
+_NEWS_SESSION.headers.update(_SESSION.headers)
+
+def get_news_session():
+    """HTTP-сессия CryptoPanic с пулом соединений, без повторов при ограничении частоты"""
+    return _NEWS_SESSION
+
+def parse_json(response):
+    """Разбор JSON-ответа через orjson, если он установлен"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+# Свечи отдаются по схеме stale-while-revalidate: моложе KLINES_FRESH_TTL - из памяти,
+# до KLINES_MAX_AGE - из памяти с фоновым обновлением, старше - синхронным запросом
+KLINES_FRESH_TTL = 60
+KLINES_MAX_AGE = 300
+
+# (symbol, period, limit) -> (время загрузки, ETag, последний разобранный DataFrame свечей)
+_KLINES_STORE = {}
+_KLINES_REFRESHING = set()
+_KLINES_LOCK = threading.Lock()
+_KLINES_REFRESH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="klines-refresh")
+# Время последнего сброса: ответы на запросы, начатые раньше, сохраняются уже устаревшими
+_KLINES_STALE_BEFORE = 0.0
+
+# Пары, которых нет на Gate.io (COAI, FARTCOIN и др.): symbol -> время последней проверки
+_MISSING_PAIRS = {}
+_MISSING_PAIR_TTL = 600
+
+def _is_known_missing(symbol):
+    """Пара недавно не нашлась на бирже - повторный запрос не нужен"""
+    return time.time() - _MISSING_PAIRS.get(symbol, 0) < _MISSING_PAIR_TTL
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_all_gateio_tickers():
+    """Получение тикеров всех пар одним запросом к Gate.io API"""
+    response = _SESSION.get(f"{GATEIO_BASE_URL}/spot/tickers", timeout=_TIMEOUT)
+    response.raise_for_status()
+    return {ticker['currency_pair']: ticker for ticker in parse_json(response)}
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_gateio_data(symbol):
+    """Получение реальных данных с Gate.io API"""
+    # Ошибку не выводим здесь (кэш запомнил бы и её) - её показывает вызывающий код
+    error = None
+    try:
+        ticker = get_all_gateio_tickers().get(symbol)
+        if ticker is None:
+            _MISSING_PAIRS[symbol] = time.time()
+        else:
+            return {
+                'symbol': symbol,
+                'last': float(ticker['last']),
+                'change_percentage': float(ticker['change_percentage']),
+                'high_24h': float(ticker['high_24h']),
+                'low_24h': float(ticker['low_24h']),
+                'quote_volume': float(ticker['quote_volume']),
+                'base_volume': float(ticker['base_volume']),
+                'source': 'Gate.io',
+                'available': True
+            }
+    except Exception as e:
+        error = f"Ошибка получения данных для {symbol}: {str(e)}"
+    
+    return {
+        'symbol': symbol,
+        'last': 0,
+        'change_percentage': 0,
+        'high_24h': 0,
+        'low_24h': 0,
+        'quote_volume': 0,
+        'source': 'Не доступно',
+        'available': False,
+        'error': error
+    }
+
+def _is_invalid_pair(response):
+    """Ответ 400 об отсутствующей паре; тело ошибки не обязательно JSON-объект"""
+    try:
+        body = parse_json(response)
+    except ValueError:
+        return False
+    return isinstance(body, dict) and body.get('label') == 'INVALID_CURRENCY_PAIR'
+
+def _store_klines(cache_key, requested_at, etag, df):
+    """Сохранение свечей в _KLINES_STORE с учетом сброса кэша во время запроса"""
+    with _KLINES_LOCK:
+        fetched_at = requested_at if requested_at >= _KLINES_STALE_BEFORE else 0.0
+        _KLINES_STORE[cache_key] = (fetched_at, etag, df)
+
+def _download_klines(symbol, period, limit):
+    """Запрос и разбор свечей Gate.io с сохранением в _KLINES_STORE; None - данных нет"""
+    url = f"{GATEIO_BASE_URL}/spot/candlesticks"
+    params = {
+        'currency_pair': symbol,
+        'limit': limit,
+        'interval': period
+    }
+    # Условный запрос: если свечи не изменились, API вернет 304 без тела
+    cache_key = (symbol, period, limit)
+    _, etag, cached_df = _KLINES_STORE.get(cache_key, (0.0, None, None))
+    headers = {'If-None-Match': etag} if etag else None
+    requested_at = time.time()
+    response = _SESSION.get(url, params=params, headers=headers, timeout=_TIMEOUT)
+    
+    if response.status_code == 304 and cached_df is not None:
+        _store_klines(cache_key, requested_at, etag, cached_df)
+        return cached_df
+    
+    if response.status_code == 400 and _is_invalid_pair(response):
+        _MISSING_PAIRS[symbol] = time.time()
+        return None
+    
+    if response.status_code == 200:
+        data = parse_json(response)
+        if isinstance(data, list) and len(data) > 0:
+            # Gate.io возвращает 8 колонок, берем первые 6 и приводим типы одним проходом
+            arr = np.asarray(data, dtype=object)[:, :6]
+            ts = arr[:, 0].astype(np.int64)
+            nums = arr[:, 1:6].astype(np.float64)
+            df = pd.DataFrame({
+                'timestamp': ts.view('datetime64[s]'),
+                'volume': nums[:, 0],
+                'close': nums[:, 1],
+                'high': nums[:, 2],
+                'low': nums[:, 3],
+                'open': nums[:, 4]
+            })
+            # API отдает свечи по возрастанию времени - полную сортировку делаем только
+            # для неупорядоченных данных, обратный порядок просто разворачиваем
+            steps = np.diff(ts)
+            if np.all(steps <= 0) and not np.all(steps == 0):
+                df = df.iloc[::-1].reset_index(drop=True)
+            elif not np.all(steps >= 0):
+                df = df.sort_values('timestamp', kind='stable', ignore_index=True)
+            
+            _store_klines(cache_key, requested_at, response.headers.get('ETag'), df)
+            return df
+    return None
+
+def _refresh_klines(cache_key):
+    """Фоновое обновление свечей; при ошибке остаются прежние данные"""
+    try:
+        _download_klines(*cache_key)
+    except Exception:
+        pass
+    finally:
+        with _KLINES_LOCK:
+            _KLINES_REFRESHING.discard(cache_key)
+
+def fetch_gateio_klines(symbol, period='15m', limit=192):
+    """Получение исторических данных с Gate.io API (48 часов = 192 * 15 минут)"""
+    if _is_known_missing(symbol):
+        return None
+    
+    cache_key = (symbol, period, limit)
+    fetched_at, _, cached_df = _KLINES_STORE.get(cache_key, (0.0, None, None))
+    age = time.time() - fetched_at
+    if cached_df is not None and age < KLINES_MAX_AGE:
+        # Устаревшие свечи отдаются сразу, новые подтягиваются в фоне к следующему обновлению
+        if age >= KLINES_FRESH_TTL:
+            with _KLINES_LOCK:
+                if cache_key not in _KLINES_REFRESHING:
+                    _KLINES_REFRESHING.add(cache_key)
+                    _KLINES_REFRESH_POOL.submit(_refresh_klines, cache_key)
+        return cached_df
+    
+    # Ошибки сети и разбора пробрасываются: функцию вызывают из рабочих потоков, где st.error
+    # не доходит до страницы, поэтому сообщение выводит вызывающий код в потоке скрипта
+    return _download_klines(symbol, period, limit)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_gateio_ticker(symbol):
+    """Данные тикера из общего запроса тикеров Gate.io и текст ошибки (или None)"""
+    # Ошибку не выводим здесь (кэш запомнил бы и её) - её показывает вызывающий код
+    try:
+        return get_all_gateio_tickers().get(symbol.replace('/', '_')), None
+    except Exception as e:
+        return None, f"Ошибка получения данных тикера: {e}"
+
+def clear_market_data_cache():
+    """Сброс кэша только тех функций, свежесть которых определяет обновление"""
+    global _KLINES_STALE_BEFORE
+    get_all_gateio_tickers.clear()
+    get_gateio_data.clear()
+    # Свечи только помечаются устаревшими: ETag и кадр остаются, и следующий запрос
+    # будет условным - при неизменных свечах Gate.io ответит 304 без тела
+    with _KLINES_LOCK:
+        _KLINES_STALE_BEFORE = time.time()
+        for cache_key, (_, etag, df) in list(_KLINES_STORE.items()):
+            _KLINES_STORE[cache_key] = (0.0, etag, df)
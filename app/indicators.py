@@ -0,0 +1,129 @@
+# Расчет технических индикаторов одним проходом по NumPy-массивам
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Без numba ядро работает как обычная Python-функция
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Порядок массивов, которые возвращает _ta_kernel
+INDICATOR_COLUMNS = (
+    'rsi', 'sma_20', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_lower', 'bb_width', 'stoch_k', 'stoch_d', 'volume_sma', 'volume_ratio'
+)
+
+# Явная сигнатура: numba компилирует ядро при импорте модуля, а не при первом вызове
+_TA_SIGNATURE = "UniTuple(f8[::1], 14)(f8[::1], f8[::1], f8[::1], f8[::1])"
+
+# Цикл последовательный (EMA и скользящие суммы зависят от предыдущего шага), поэтому
+# parallel и fastmath не используются: fastmath ломает NaN в начале окон. error_model='numpy'
+# убирает проверки деления на ноль - все деления в ядре и так защищены условиями
+@njit(_TA_SIGNATURE, cache=True, error_model='numpy')
+def _ta_kernel(high, low, close, volume):
+    """Все индикаторы за один цикл: RSI, SMA/EMA, MACD, Bollinger, Stochastic, объем"""
+    n = len(close)
+    rsi = np.full(n, np.nan)
+    sma_20 = np.full(n, np.nan)
+    ema_12 = np.empty(n)
+    ema_26 = np.empty(n)
+    macd = np.empty(n)
+    macd_signal = np.empty(n)
+    macd_histogram = np.empty(n)
+    bb_upper = np.full(n, np.nan)
+    bb_lower = np.full(n, np.nan)
+    bb_width = np.full(n, np.nan)
+    stoch_k = np.full(n, np.nan)
+    stoch_d = np.full(n, np.nan)
+    volume_sma = np.full(n, np.nan)
+    volume_ratio = np.full(n, np.nan)
+    
+    # Веса EMA как у pandas ewm(span=...).mean() с adjust=True
+    decay_12 = 1.0 - 2.0 / 13.0
+    decay_26 = 1.0 - 2.0 / 27.0
+    decay_9 = 1.0 - 2.0 / 10.0
+    num_12 = num_26 = num_9 = 0.0
+    den_12 = den_26 = den_9 = 0.0
+    
+    avg_gain = avg_loss = 0.0
+    close_sum = volume_sum = 0.0
+    
+    for i in range(n):
+        # EMA 12/26 и MACD с сигнальной линией
+        num_12 = close[i] + decay_12 * num_12
+        den_12 = 1.0 + decay_12 * den_12
+        num_26 = close[i] + decay_26 * num_26
+        den_26 = 1.0 + decay_26 * den_26
+        ema_12[i] = num_12 / den_12
+        ema_26[i] = num_26 / den_26
+        macd[i] = ema_12[i] - ema_26[i]
+        num_9 = macd[i] + decay_9 * num_9
+        den_9 = 1.0 + decay_9 * den_9
+        macd_signal[i] = num_9 / den_9
+        macd_histogram[i] = macd[i] - macd_signal[i]
+        
+        # RSI по Уайлдеру (как TA-Lib/TradingView): первые 14 изменений усредняются,
+        # дальше средние роста и падения сглаживаются рекурсивно с весом 1/14
+        if i > 0:
+            delta = close[i] - close[i - 1]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if i <= 14:
+                avg_gain += gain / 14.0
+                avg_loss += loss / 14.0
+            else:
+                avg_gain = (avg_gain * 13.0 + gain) / 14.0
+                avg_loss = (avg_loss * 13.0 + loss) / 14.0
+        if i >= 14:
+            if avg_loss > 0:
+                rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            elif avg_gain > 0:
+                rsi[i] = 100.0
+        
+        # SMA 20 и полосы Боллинджера (std с ddof=1, двухпроходный расчет по окну)
+        close_sum += close[i]
+        volume_sum += volume[i]
+        if i >= 20:
+            close_sum -= close[i - 20]
+            volume_sum -= volume[i - 20]
+        if i >= 19:
+            mean = close_sum / 20.0
+            sq_sum = 0.0
+            for j in range(i - 19, i + 1):
+                sq_sum += (close[j] - mean) ** 2
+            std = np.sqrt(sq_sum / 19.0)
+            sma_20[i] = mean
+            bb_upper[i] = mean + 2.0 * std
+            bb_lower[i] = mean - 2.0 * std
+            if mean != 0:
+                bb_width[i] = (bb_upper[i] - bb_lower[i]) / mean
+            
+            volume_sma[i] = volume_sum / 20.0
+            if volume_sma[i] != 0:
+                volume_ratio[i] = volume[i] / volume_sma[i]
+        
+        # Stochastic %K по 14 свечам и %D как среднее трех последних %K
+        if i >= 13:
+            low_14 = low[i]
+            high_14 = high[i]
+            for j in range(i - 13, i):
+                low_14 = min(low_14, low[j])
+                high_14 = max(high_14, high[j])
+            if high_14 > low_14:
+                stoch_k[i] = 100.0 * (close[i] - low_14) / (high_14 - low_14)
+        if i >= 15:
+            stoch_d[i] = (stoch_k[i] + stoch_k[i - 1] + stoch_k[i - 2]) / 3.0
+    
+    return (rsi, sma_20, ema_12, ema_26, macd, macd_signal, macd_histogram,
+            bb_upper, bb_lower, bb_width, stoch_k, stoch_d, volume_sma, volume_ratio)
+
+def compute_indicators(high, low, close, volume):
+    """Словарь колонок индикаторов для DataFrame.assign"""
+    # Сигнатура ядра принимает только записываемые C-массивы (pandas с CoW отдает read-only)
+    arrays = _ta_kernel(*(np.require(a, dtype=np.float64, requirements='CW') for a in (high, low, close, volume)))
+    columns = dict(zip(INDICATOR_COLUMNS, arrays))
+    columns['bb_middle'] = columns['sma_20']
+    return columns
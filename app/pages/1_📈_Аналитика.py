@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import requests
 import numpy as np
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
+import json
 import os
+import tempfile
+import time
+from collections import Counter
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 
 st.set_page_config(
     page_title="Детальный анализ",
@@ -13,81 +17,68 @@ st.set_page_config(
     layout="wide"
 )
 
-# Получаем функцию из главного файла
-from app import get_gateio_data, CRYPTO_PAIRS
+# Общий слой данных Gate.io
+from data import CRYPTO_PAIRS, get_gateio_data, fetch_gateio_ticker, fetch_gateio_klines, clear_market_data_cache, get_news_session, parse_json
+from indicators import compute_indicators
+
+# Пары в виде для выбора пользователем и обратное соответствие символам API
+DISPLAY_PAIRS = tuple(pair.replace('_', '/') for pair in CRYPTO_PAIRS)
+API_PAIRS = dict(zip(DISPLAY_PAIRS, CRYPTO_PAIRS))
 
 # Конфигурация API - БЕЗОПАСНОЕ ХРАНЕНИЕ КЛЮЧЕЙ
 # Используем переменные окружения для безопасности
 CRYPTOPANIC_API_KEY = st.secrets.get("CRYPTOPANIC_API_KEY", "052011e0dd2887f9f02935fd870d3f777229f77e")
 
-# Конфигурация Gate.io API
-GATEIO_BASE_URL = "https://api.gateio.ws/api/v4"
 CRYPTOPANIC_BASE_URL = "https://cryptopanic.com/api/v1/posts/"
 
-@st.cache_data(ttl=300)
-def fetch_gateio_klines(symbol, period='15m', limit=192):
-    """Получение исторических данных с Gate.io API"""
-    try:
-        url = f"{GATEIO_BASE_URL}/spot/candlesticks"
-        params = {
-            'currency_pair': symbol.replace('/', '_'),
-            'limit': limit,
-            'interval': period
-        }
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if isinstance(data, list) and len(data) > 0:
-                df = pd.DataFrame(data)
-                df = df.iloc[:, :6]
-                df.columns = ['timestamp', 'volume', 'close', 'high', 'low', 'open']
-                
-                numeric_cols = ['open', 'high', 'low', 'close', 'volume']
-                for col in numeric_cols:
-                    df[col] = pd.to_numeric(df[col])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-                return df.sort_values('timestamp')
-    except Exception as e:
-        st.error(f"Ошибка получения исторических данных: {e}")
-    return None
+# Дисковый кэш новостей: переживает перезапуск приложения и подменяет ответ при ошибках API
+NEWS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".streamlit_cache", "cryptopanic")
+NEWS_CACHE_TTL = 300
 
-@st.cache_data(ttl=60)  # Кэшируем на 60 секунд для актуальности
-def fetch_gateio_ticker(symbol):
-    """Получение актуальных данных по тикеру с Gate.io API"""
+def _news_cache_path(symbol, filter_type):
+    """Файл дискового кэша для пары и фильтра новостей"""
+    return os.path.join(NEWS_CACHE_DIR, f"{symbol or 'all'}_{filter_type}.json".replace('/', '_'))
+
+def _read_news_cache(path):
+    """Запись дискового кэша новостей или None"""
     try:
-        url = f"{GATEIO_BASE_URL}/spot/tickers"
-        params = {'currency_pair': symbol.replace('/', '_')}
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if isinstance(data, list) and len(data) > 0:
-                return data[0]
-    except Exception as e:
-        st.error(f"Ошибка получения данных тикера: {e}")
-    return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
-@st.cache_data(ttl=300)
-def fetch_gateio_market_data(symbol):
-    """Получение расширенных рыночных данных"""
+def _write_news_cache(path, results):
+    """Атомарная запись новостей в дисковый кэш"""
+    tmp_path = None
     try:
-        # Получаем детальную информацию о паре
-        url = f"{GATEIO_BASE_URL}/spot/currency_pairs"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            pairs_data = response.json()
-            target_pair = next((pair for pair in pairs_data 
-                              if pair['id'] == symbol.replace('/', '_')), None)
-            return target_pair
-    except Exception as e:
-        st.error(f"Ошибка получения рыночных данных: {e}")
-    return None
+        os.makedirs(NEWS_CACHE_DIR, exist_ok=True)
+        # Уникальный временный файл: параллельные записи одного ключа не перемешиваются
+        fd, tmp_path = tempfile.mkstemp(dir=NEWS_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'ts': time.time(), 'results': results}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+@st.cache_resource
+def _news_refresh_state():
+    """Время последнего ручного обновления: записи диска старше него не считаются свежими"""
+    return {'refreshed_at': 0.0}
 
-@st.cache_data(ttl=300)
+# Спиннер показывает вызывающий код; фоновый прогрев вызывает функцию из рабочих потоков
+@st.cache_data(ttl=300, show_spinner=False)
 def get_cryptopanic_news(symbol=None, filter_type="all"):
-    """Получение новостей с CryptoPanic API"""
+    """Новости с CryptoPanic API и текст ошибки (или None) для вывода в потоке скрипта"""
+    cache_path = _news_cache_path(symbol, filter_type)
+    cached = _read_news_cache(cache_path)
+    # Диск подменяет запрос только при холодном кэше в памяти (перезапуск), но не после ручного обновления
+    cached_ts = cached.get('ts', 0) if cached else 0
+    if cached_ts > _news_refresh_state()['refreshed_at'] and time.time() - cached_ts < NEWS_CACHE_TTL:
+        return cached.get('results', []), None
+    # При ошибке API показываем последние сохраненные новости, даже устаревшие
+    stale_results = cached.get('results', []) if cached else []
+    
     try:
         params = {
             'auth_token': CRYPTOPANIC_API_KEY,
@@ -99,30 +90,54 @@ def get_cryptopanic_news(symbol=None, filter_type="all"):
             coin_symbol = symbol.replace('_USDT', '').replace('/USDT', '')
             params['currencies'] = coin_symbol
         
-        response = requests.get(CRYPTOPANIC_BASE_URL, params=params, timeout=10)
+        # Keep-alive соединение с CryptoPanic переиспользуется между обновлениями страницы
+        response = get_news_session().get(CRYPTOPANIC_BASE_URL, params=params, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
-            return data.get('results', [])
+            data = parse_json(response)
+            results = data.get('results', [])
+            _write_news_cache(cache_path, results)
+            return results, None
         else:
-            st.error(f"Ошибка CryptoPanic API: {response.status_code}")
-            return []
+            return stale_results, f"Ошибка CryptoPanic API: {response.status_code}"
             
     except Exception as e:
-        st.error(f"Ошибка получения новостей: {e}")
-        return []
+        return stale_results, f"Ошибка получения новостей: {e}"
+
+@st.cache_resource(show_spinner=False)
+def _news_prewarm_state():
+    """Общий для процесса пул прогрева новостей и время последнего прогрева по парам"""
+    # Два потока не устраивают всплеск запросов к CryptoPanic при ограничении частоты
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="news-prewarm"), {}
+
+def _prewarm_news(skip_symbol):
+    """Фоновый прогрев кэша новостей остальных торгуемых пар по истечении его срока"""
+    pool, warmed_at = _news_prewarm_state()
+    now = time.time()
+    for pair in CRYPTO_PAIRS:
+        # Пару, прогретую меньше срока жизни кэша назад, повторно не запрашиваем
+        if pair == skip_symbol or now - warmed_at.get(pair, 0) < NEWS_CACHE_TTL:
+            continue
+        if get_gateio_data(pair)['available']:
+            warmed_at[pair] = now
+            # Задача ставится в пул без ожидания: выбранная пара не ждет чужих запросов
+            pool.submit(get_cryptopanic_news, pair, "all")
+
+# Маркеры сентимента новостей
+SENTIMENT_EMOJI = {'positive': '🟢', 'neutral': '⚪', 'negative': '🔴'}
 
 def analyze_news_sentiment(news_items):
     """Анализ сентимента новостей"""
     if not news_items:
         return {'neutral': 0, 'positive': 0, 'negative': 0, 'total': 0, 'news_score': 0}
     
-    sentiment_count = {'neutral': 0, 'positive': 0, 'negative': 0, 'total': len(news_items)}
-    
-    for item in news_items:
-        sentiment = item.get('sentiment', 'neutral')
-        if sentiment in sentiment_count:
-            sentiment_count[sentiment] += 1
+    counts = Counter(item.get('sentiment', 'neutral') for item in news_items)
+    sentiment_count = {
+        'neutral': counts['neutral'],
+        'positive': counts['positive'],
+        'negative': counts['negative'],
+        'total': len(news_items)
+    }
     
     # Расчет общего скора новостей
     total_score = (sentiment_count['positive'] - sentiment_count['negative']) / sentiment_count['total'] * 100
@@ -130,135 +145,104 @@ def analyze_news_sentiment(news_items):
     
     return sentiment_count
 
-def get_crypto_specific_news(symbol):
-    """Получение специфической информации о криптовалюте - ОБНОВЛЕНО С РЕАЛЬНЫМИ ДАННЫМИ"""
-    crypto_analysis = {
-        'DOGE/USDT': {
-            'name': 'Dogecoin',
-            'description': 'Мем-криптовалюта с сильным комьюнити, созданная как шутка',
-            'market_cap': 'Динамический - обновляется в реальном времени',
-            'sentiment': 'Высокая волатильность, сильно зависит от упоминаний в соцсетях',
-            'risk': 'Высокий',
-            'key_factors': [
-                'Сильное влияние соцсетей и упоминаний знаменитостей',
-                'Высокая волатильность из-за розничных инвесторов',
-                'Широкая известность и принятие как "входного" актива'
-            ],
-            'recent_trends': [
-                'Активность в Twitter/X влияет на краткосрочные движения',
-                'Увеличение принятия как средства для чаевых'
-            ],
-            'channels': [
-                'Crypto Twitter influencers',
-                'Telegram trading groups',
-                'Reddit crypto communities'
-            ]
-        },
-        'LINK/USDT': {
-            'name': 'Chainlink',
-            'description': 'Децентрализованный oracle-протокол для подключения смарт-контрактов к реальным данным',
-            'market_cap': 'Динамический - обновляется в реальном времени',
-            'sentiment': 'Стабильный проект с реальным использованием',
-            'risk': 'Средний',
-            'key_factors': [
-                'Партнерства с традиционными финансовыми институтами',
-                'Развитие DeFi экосистемы',
-                'Технологические обновления протокола'
-            ],
-            'recent_trends': [
-                'Рост интеграций в традиционных финансах',
-                'Развитие staking механизмов'
-            ],
-            'channels': [
-                'DeFi analytics platforms',
-                'Blockchain development communities',
-                'Institutional crypto reports'
-            ]
-        },
-        # ... (остальные криптовалюты с обновленным market_cap)
-    }
-    
-    return crypto_analysis.get(symbol, {
-        'name': 'Unknown',
-        'description': 'Информация о криптовалюте',
+# Справочная информация по парам собирается один раз при загрузке страницы и доступна только для чтения:
+# вложенные записи - тоже MappingProxyType, а списки факторов и каналов - кортежи
+CRYPTO_ANALYSIS = MappingProxyType({
+    'DOGE/USDT': MappingProxyType({
+        'name': 'Dogecoin',
+        'description': 'Мем-криптовалюта с сильным комьюнити, созданная как шутка',
         'market_cap': 'Динамический - обновляется в реальном времени',
-        'sentiment': 'Неизвестно',
+        'sentiment': 'Высокая волатильность, сильно зависит от упоминаний в соцсетях',
         'risk': 'Высокий',
-        'key_factors': ['Технический анализ', 'Рыночные условия'],
-        'recent_trends': ['Общие рыночные тренды'],
-        'channels': ['Общие крипто-каналы']
-    })
+        'key_factors': (
+            'Сильное влияние соцсетей и упоминаний знаменитостей',
+            'Высокая волатильность из-за розничных инвесторов',
+            'Широкая известность и принятие как "входного" актива'
+        ),
+        'recent_trends': (
+            'Активность в Twitter/X влияет на краткосрочные движения',
+            'Увеличение принятия как средства для чаевых'
+        ),
+        'channels': (
+            'Crypto Twitter influencers',
+            'Telegram trading groups',
+            'Reddit crypto communities'
+        )
+    }),
+    'LINK/USDT': MappingProxyType({
+        'name': 'Chainlink',
+        'description': 'Децентрализованный oracle-протокол для подключения смарт-контрактов к реальным данным',
+        'market_cap': 'Динамический - обновляется в реальном времени',
+        'sentiment': 'Стабильный проект с реальным использованием',
+        'risk': 'Средний',
+        'key_factors': (
+            'Партнерства с традиционными финансовыми институтами',
+            'Развитие DeFi экосистемы',
+            'Технологические обновления протокола'
+        ),
+        'recent_trends': (
+            'Рост интеграций в традиционных финансах',
+            'Развитие staking механизмов'
+        ),
+        'channels': (
+            'DeFi analytics platforms',
+            'Blockchain development communities',
+            'Institutional crypto reports'
+        )
+    }),
+    # ... (остальные криптовалюты с обновленным market_cap)
+})
+
+DEFAULT_CRYPTO_INFO = MappingProxyType({
+    'name': 'Unknown',
+    'description': 'Информация о криптовалюте',
+    'market_cap': 'Динамический - обновляется в реальном времени',
+    'sentiment': 'Неизвестно',
+    'risk': 'Высокий',
+    'key_factors': ('Технический анализ', 'Рыночные условия'),
+    'recent_trends': ('Общие рыночные тренды',),
+    'channels': ('Общие крипто-каналы',)
+})
 
-def calculate_technical_indicators(df):
+def get_crypto_specific_news(symbol):
+    """Получение специфической информации о криптовалюте - ОБНОВЛЕНО С РЕАЛЬНЫМИ ДАННЫМИ"""
+    return CRYPTO_ANALYSIS.get(symbol, DEFAULT_CRYPTO_INFO)
+
+def _frame_key(symbol, df):
+    """Дешевый ключ кэша для DataFrame свечей пары вместо хэширования всех байтов"""
+    close = df['close'].to_numpy()
+    # У текущей свечи high/low и объем растут и при неизменном close
+    return (
+        symbol, df.shape, int(df['timestamp'].to_numpy()[-1].view(np.int64)), float(close[-1]), float(close.sum()),
+        float(df['high'].to_numpy()[-1]), float(df['low'].to_numpy()[-1]), float(df['volume'].to_numpy()[-1])
+    )
+
+# Спиннер показывает вызывающий код, поэтому собственный спиннер кэша отключен.
+# Свечи (_df) Streamlit не хэширует: ключ кэша - посчитанный один раз frame_key
+@st.cache_data(ttl=300, show_spinner=False)
+def calculate_technical_indicators(frame_key, _df):
     """Расчет всех технических индикаторов с пояснениями"""
+    df = _df
+    # 20 свечей хватает, чтобы последняя строка всех индикаторов была заполнена
+    # (EMA/MACD с adjust=True определены с первой свечи, самое длинное окно - SMA 20)
     if df is None or len(df) < 20:
         return df, {}
     
-    try:
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Moving Averages
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # Bollinger Bands
-        df['bb_middle'] = df['close'].rolling(window=20).mean()
-        bb_std = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-        df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-        
-        # Stochastic
-        low_14 = df['low'].rolling(window=14).min()
-        high_14 = df['high'].rolling(window=14).max()
-        df['stoch_k'] = 100 * ((df['close'] - low_14) / (high_14 - low_14))
-        df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
-        
-        # Volume indicators
-        df['volume_sma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_sma']
-        
-        # Подготовка пояснений для индикаторов
-        explanations = generate_indicator_explanations(df)
-        
-    except Exception as e:
-        st.error(f"Ошибка расчета индикаторов: {e}")
-        return df, {}
+    # Все индикаторы считаются одним ядром, DataFrame собираем один раз
+    df = df.assign(**compute_indicators(
+        df['high'].to_numpy(), df['low'].to_numpy(),
+        df['close'].to_numpy(), df['volume'].to_numpy()
+    ))
     
-    return df, explanations
+    # Подготовка пояснений для индикаторов
+    return df, generate_indicator_explanations(df)
 
-def generate_indicator_explanations(df):
-    """Генерация пояснений для технических индикаторов"""
-    if df.empty:
-        return {}
-    
-    current_rsi = df['rsi'].iloc[-1]
-    current_macd = df['macd'].iloc[-1]
-    current_macd_signal = df['macd_signal'].iloc[-1]
-    current_stoch_k = df['stoch_k'].iloc[-1]
-    current_stoch_d = df['stoch_d'].iloc[-1]
-    current_close = df['close'].iloc[-1]
-    current_sma_20 = df['sma_20'].iloc[-1]
-    
-    explanations = {
-        'rsi': {
-            'value': current_rsi,
-            'interpretation': get_rsi_interpretation(current_rsi),
-            'explanation': f"""
+# Шаблоны подробных пояснений: в кэш попадают только значения, текст собирается при выводе
+EXPLANATION_TEMPLATES = {
+    'rsi': """
             **RSI (Relative Strength Index) - Индекс Относительной Силы**
             
-            **Текущее значение:** {current_rsi:.2f}
+            **Текущее значение:** {value:.2f}
             
             **Как работает:**
             - Измеряет скорость и изменение ценовых движений
@@ -268,25 +252,20 @@ def generate_indicator_explanations(df):
             - Нейтральная зона: 30-70
             
             **Интерпретация:**
-            {get_rsi_interpretation(current_rsi)}
+            {interpretation}
             
             **Торговая стратегия:**
             - При RSI > 70: Рассмотрите продажу или сокращение позиции
             - При RSI < 30: Рассмотрите покупку или увеличение позиции
             - При RSI 30-70: Следуйте основному тренду
-            """
-        },
-        'macd': {
-            'value': current_macd,
-            'signal': current_macd_signal,
-            'interpretation': get_macd_interpretation(current_macd, current_macd_signal),
-            'explanation': f"""
+            """,
+    'macd': """
             **MACD (Moving Average Convergence Divergence)**
             
             **Текущие значения:**
-            - MACD: {current_macd:.6f}
-            - Сигнальная линия: {current_macd_signal:.6f}
-            - Разница: {(current_macd - current_macd_signal):.6f}
+            - MACD: {value:.6f}
+            - Сигнальная линия: {signal:.6f}
+            - Разница: {difference:.6f}
             
             **Как работает:**
             - Показывает взаимосвязь между двумя скользящими средними
@@ -295,24 +274,19 @@ def generate_indicator_explanations(df):
             - Пересечение линий = смена тренда
             
             **Интерпретация:**
-            {get_macd_interpretation(current_macd, current_macd_signal)}
+            {interpretation}
             
             **Торговая стратегия:**
             - Покупать при пересечении MACD снизу вверх
             - Продавать при пересечении MACD сверху вниз
             - Подтверждать другими индикаторами
-            """
-        },
-        'stochastic': {
-            'k': current_stoch_k,
-            'd': current_stoch_d,
-            'interpretation': get_stoch_interpretation(current_stoch_k, current_stoch_d),
-            'explanation': f"""
+            """,
+    'stochastic': """
             **Stochastic Oscillator**
             
             **Текущие значения:**
-            - Линия %K: {current_stoch_k:.2f}
-            - Линия %D: {current_stoch_d:.2f}
+            - Линия %K: {k:.2f}
+            - Линия %D: {d:.2f}
             
             **Как работает:**
             - Сравнивает цену закрытия с ценовым диапазоном за период
@@ -321,24 +295,20 @@ def generate_indicator_explanations(df):
             - Быстро реагирует на изменения цены
             
             **Интерпретация:**
-            {get_stoch_interpretation(current_stoch_k, current_stoch_d)}
+            {interpretation}
             
             **Торговая стратегия:**
             - Покупать при выходе из зоны перепроданности
             - Продавать при выходе из зоны перекупленности
             - Искать дивергенции для сильных сигналов
-            """
-        },
-        'trend': {
-            'price_vs_sma': current_close - current_sma_20,
-            'interpretation': get_trend_interpretation(current_close, current_sma_20),
-            'explanation': f"""
+            """,
+    'trend': """
             **Анализ тренда по скользящим средним**
             
             **Текущие значения:**
-            - Текущая цена: {current_close:.6f}
-            - SMA 20: {current_sma_20:.6f}
-            - Отклонение: {((current_close - current_sma_20)/current_sma_20*100):.2f}%
+            - Текущая цена: {price:.6f}
+            - SMA 20: {sma_20:.6f}
+            - Отклонение: {deviation:.2f}%
             
             **Как работает:**
             - SMA 20 показывает среднюю цену за 20 периодов
@@ -347,106 +317,174 @@ def generate_indicator_explanations(df):
             - Чем больше отклонение, тем сильнее тренд
             
             **Интерпретация:**
-            {get_trend_interpretation(current_close, current_sma_20)}
+            {interpretation}
             
             **Торговая стратегия:**
             - Покупать при цене выше SMA в восходящем тренде
             - Продавать при цене ниже SMA в нисходящем тренде
             - Использовать для определения направления тренда
             """
+}
+
+def generate_indicator_explanations(df):
+    """Генерация пояснений для технических индикаторов"""
+    if df.empty:
+        return {}
+    
+    # Последняя строка читается один раз в скаляры float
+    current_rsi, current_macd, current_macd_signal, current_stoch_k, current_stoch_d, current_close, current_sma_20 = (
+        float(x) for x in df[['rsi', 'macd', 'macd_signal', 'stoch_k', 'stoch_d', 'close', 'sma_20']].to_numpy(dtype=np.float64)[-1]
+    )
+    
+    rsi_direction, rsi_text = get_rsi_interpretation(current_rsi)
+    macd_direction, macd_text = get_macd_interpretation(current_macd, current_macd_signal)
+    stoch_direction, stoch_text = get_stoch_interpretation(current_stoch_k, current_stoch_d)
+    trend_direction, trend_text = get_trend_interpretation(current_close, current_sma_20)
+    
+    explanations = {
+        'rsi': {
+            'value': current_rsi,
+            'direction': rsi_direction,
+            'interpretation': rsi_text
+        },
+        'macd': {
+            'value': current_macd,
+            'signal': current_macd_signal,
+            'difference': current_macd - current_macd_signal,
+            'direction': macd_direction,
+            'interpretation': macd_text
+        },
+        'stochastic': {
+            'k': current_stoch_k,
+            'd': current_stoch_d,
+            'direction': stoch_direction,
+            'interpretation': stoch_text
+        },
+        'trend': {
+            'price_vs_sma': current_close - current_sma_20,
+            'price': current_close,
+            'sma_20': current_sma_20,
+            'deviation': (current_close - current_sma_20) / current_sma_20 * 100 if current_sma_20 else 0.0,
+            'direction': trend_direction,
+            'interpretation': trend_text
         }
     }
     
     return explanations
 
+def render_explanation(indicator, info):
+    """Текст подробного пояснения индикатора по шаблону"""
+    return EXPLANATION_TEMPLATES[indicator].format_map(info)
+
+# Направление сигнала: 1 - бычий, -1 - медвежий, 0 - нейтральный. Интерпретации возвращают пару (направление, текст)
+
+# Тексты RSI от сильной перепроданности к сильной перекупленности
+RSI_INTERPRETATIONS = (
+    (1, "✅ СИЛЬНАЯ ПЕРЕПРОДАННОСТЬ - Высокая вероятность отскока вверх. Актив недооценен, возможен разворот."),
+    (1, "📈 ПЕРЕПРОДАННОСТЬ - Возможен технический отскок. Хорошая точка для рассмотрения покупки."),
+    (0, "⚪ НЕЙТРАЛЬНАЯ ЗОНА - Тренд сохраняется. Следуйте текущему направлению рынка."),
+    (-1, "⚠️ ПЕРЕКУПЛЕННОСТЬ - Возможна локальная коррекция. Рынок перегрет, будьте осторожны с новыми покупками."),
+    (-1, "❌ СИЛЬНАЯ ПЕРЕКУПЛЕННОСТЬ - Высокая вероятность коррекции вниз. Цена значительно отклонилась от средних значений и может скоро развернуться.")
+)
+
 def get_rsi_interpretation(rsi):
     """Интерпретация значений RSI"""
-    if rsi > 80:
-        return "❌ СИЛЬНАЯ ПЕРЕКУПЛЕННОСТЬ - Высокая вероятность коррекции вниз. Цена значительно отклонилась от средних значений и может скоро развернуться."
-    elif rsi > 70:
-        return "⚠️ ПЕРЕКУПЛЕННОСТЬ - Возможна локальная коррекция. Рынок перегрет, будьте осторожны с новыми покупками."
-    elif rsi < 20:
-        return "✅ СИЛЬНАЯ ПЕРЕПРОДАННОСТЬ - Высокая вероятность отскока вверх. Актив недооценен, возможен разворот."
-    elif rsi < 30:
-        return "📈 ПЕРЕПРОДАННОСТЬ - Возможен технический отскок. Хорошая точка для рассмотрения покупки."
-    else:
-        return "⚪ НЕЙТРАЛЬНАЯ ЗОНА - Тренд сохраняется. Следуйте текущему направлению рынка."
+    if rsi != rsi:
+        return RSI_INTERPRETATIONS[2]
+    return RSI_INTERPRETATIONS[int(rsi >= 20) + int(rsi >= 30) + int(rsi > 70) + int(rsi > 80)]
+
+# Тексты MACD от сильного медвежьего к сильному бычьему сигналу
+MACD_INTERPRETATIONS = (
+    (-1, "🔴 СИЛЬНЫЙ МЕДВЕЖИЙ СИГНАЛ - MACD ниже сигнальной линии и ниже нуля. Тренд нисходящий, momentum отрицательный."),
+    (-1, "📉 МЕДВЕЖИЙ СИГНАЛ - MACD ниже сигнальной линии. Начало нисходящего движения."),
+    (1, "📈 БЫЧИЙ СИГНАЛ - MACD выше сигнальной линии. Начало восходящего движения."),
+    (1, "🟢 СИЛЬНЫЙ БЫЧИЙ СИГНАЛ - MACD выше сигнальной линии и выше нуля. Тренд восходящий, momentum положительный.")
+)
 
 def get_macd_interpretation(macd, signal):
     """Интерпретация значений MACD"""
     diff = macd - signal
-    if diff > 0 and macd > 0:
-        return "🟢 СИЛЬНЫЙ БЫЧИЙ СИГНАЛ - MACD выше сигнальной линии и выше нуля. Тренд восходящий, momentum положительный."
-    elif diff > 0:
-        return "📈 БЫЧИЙ СИГНАЛ - MACD выше сигнальной линии. Начало восходящего движения."
-    elif diff < 0 and macd < 0:
-        return "🔴 СИЛЬНЫЙ МЕДВЕЖИЙ СИГНАЛ - MACD ниже сигнальной линии и ниже нуля. Тренд нисходящий, momentum отрицательный."
-    else:
-        return "📉 МЕДВЕЖИЙ СИГНАЛ - MACD ниже сигнальной линии. Начало нисходящего движения."
+    if diff > 0:
+        return MACD_INTERPRETATIONS[2 + int(macd > 0)]
+    return MACD_INTERPRETATIONS[int(not (diff < 0 and macd < 0))]
+
+# Тексты Stochastic: индекс по числу линий в зоне перекупленности (строка) и перепроданности (столбец)
+STOCH_NEUTRAL = (0, "⚪ НЕЙТРАЛЬНАЯ ЗОНА - Тренд сохраняется. Следуйте основному направлению.")
+STOCH_OVERSOLD = (1, "📈 ПЕРЕПРОДАННОСТЬ - Один из показателей в зоне перепроданности. Возможен технический отскок.")
+STOCH_STRONG_OVERSOLD = (1, "✅ СИЛЬНАЯ ПЕРЕПРОДАННОСТЬ - Оба показателя в зоне перепроданности. Высокая вероятность отскока вверх.")
+STOCH_OVERBOUGHT = (-1, "⚠️ ПЕРЕКУПЛЕННОСТЬ - Один из показателей в зоне перекупленности. Возможна коррекция.")
+STOCH_STRONG_OVERBOUGHT = (-1, "❌ СИЛЬНАЯ ПЕРЕКУПЛЕННОСТЬ - Оба показателя в зоне перекупленности. Высокий риск разворота вниз.")
+STOCH_INTERPRETATIONS = (
+    (STOCH_NEUTRAL, STOCH_OVERSOLD, STOCH_STRONG_OVERSOLD),
+    (STOCH_OVERBOUGHT, STOCH_OVERBOUGHT, STOCH_OVERBOUGHT),
+    (STOCH_STRONG_OVERBOUGHT, STOCH_STRONG_OVERBOUGHT, STOCH_STRONG_OVERBOUGHT)
+)
 
 def get_stoch_interpretation(k, d):
     """Интерпретация значений Stochastic"""
-    if k > 80 and d > 80:
-        return "❌ СИЛЬНАЯ ПЕРЕКУПЛЕННОСТЬ - Оба показателя в зоне перекупленности. Высокий риск разворота вниз."
-    elif k > 80 or d > 80:
-        return "⚠️ ПЕРЕКУПЛЕННОСТЬ - Один из показателей в зоне перекупленности. Возможна коррекция."
-    elif k < 20 and d < 20:
-        return "✅ СИЛЬНАЯ ПЕРЕПРОДАННОСТЬ - Оба показателя в зоне перепроданности. Высокая вероятность отскока вверх."
-    elif k < 20 or d < 20:
-        return "📈 ПЕРЕПРОДАННОСТЬ - Один из показателей в зоне перепроданности. Возможен технический отскок."
-    else:
-        return "⚪ НЕЙТРАЛЬНАЯ ЗОНА - Тренд сохраняется. Следуйте основному направлению."
+    return STOCH_INTERPRETATIONS[int(k > 80) + int(d > 80)][int(k < 20) + int(d < 20)]
+
+# Тексты тренда от сильного нисходящего к сильному восходящему
+TREND_INTERPRETATIONS = (
+    (-1, "🔴 СИЛЬНЫЙ НИСХОДЯЩИЙ ТРЕНД - Цена значительно ниже скользящей средней. Тренд уверенно нисходящий."),
+    (-1, "📉 НИСХОДЯЩИЙ ТРЕНД - Цена ниже скользящей средней. Тренд нисходящий."),
+    (0, "⚪ БОКОВОЙ ТРЕНД - Цена вблизи скользящей средней. Рынок в консолидации."),
+    (1, "📈 ВОСХОДЯЩИЙ ТРЕНД - Цена выше скользящей средней. Тренд восходящий."),
+    (1, "🟢 СИЛЬНЫЙ ВОСХОДЯЩИЙ ТРЕНД - Цена значительно выше скользящей средней. Тренд уверенно восходящий.")
+)
 
 def get_trend_interpretation(price, sma_20):
     """Интерпретация тренда"""
+    if not sma_20:
+        return TREND_INTERPRETATIONS[2]
     deviation = ((price - sma_20) / sma_20) * 100
-    if deviation > 5:
-        return "🟢 СИЛЬНЫЙ ВОСХОДЯЩИЙ ТРЕНД - Цена значительно выше скользящей средней. Тренд уверенно восходящий."
-    elif deviation > 2:
-        return "📈 ВОСХОДЯЩИЙ ТРЕНД - Цена выше скользящей средней. Тренд восходящий."
-    elif deviation < -5:
-        return "🔴 СИЛЬНЫЙ НИСХОДЯЩИЙ ТРЕНД - Цена значительно ниже скользящей средней. Тренд уверенно нисходящий."
-    elif deviation < -2:
-        return "📉 НИСХОДЯЩИЙ ТРЕНД - Цена ниже скользящей средней. Тренд нисходящий."
-    else:
-        return "⚪ БОКОВОЙ ТРЕНД - Цена вблизи скользящей средней. Рынок в консолидации."
+    if deviation != deviation:
+        return TREND_INTERPRETATIONS[2]
+    return TREND_INTERPRETATIONS[int(deviation >= -5) + int(deviation >= -2) + int(deviation > 2) + int(deviation > 5)]
+
+# Уровни коррекции Фибоначчи и соответствующие им доли диапазона
+FIB_LEVELS = ('0.0', '0.236', '0.382', '0.5', '0.618', '0.786', '1.0')
+FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0])
 
 def calculate_fibonacci_levels(df):
     """Расчет уровней Фибоначчи"""
     if df is None or len(df) == 0:
         return {}
     
-    high = df['high'].max()
-    low = df['low'].min()
+    # Редукции по массивам NumPy без диспетчеризации pandas (NaN пропускаются, как в Series.max)
+    high = float(np.nanmax(df['high'].to_numpy()))
+    low = float(np.nanmin(df['low'].to_numpy()))
     
     if high <= low:
         return {}
     
-    diff = high - low
-    return {
-        '0.0': high,
-        '0.236': high - 0.236 * diff,
-        '0.382': high - 0.382 * diff,
-        '0.5': high - 0.5 * diff,
-        '0.618': high - 0.618 * diff,
-        '0.786': high - 0.786 * diff,
-        '1.0': low
-    }
+    prices = high - FIB_RATIOS * (high - low)
+    prices[-1] = low
+    return dict(zip(FIB_LEVELS, prices.tolist()))
+
+def _f32(series):
+    """Данные серии в float32 - для графика такой точности достаточно"""
+    return series.to_numpy(dtype=np.float32)
 
-def create_comprehensive_chart(df, symbol, fib_levels):
+def create_comprehensive_chart(df, symbol, fib_levels, frame_key):
     """Создание комплексного графика с УЛУЧШЕННЫМИ уровнями Фибоначчи"""
     if df is None or len(df) == 0:
         return None
     
+    # Уровни Фибоначчи считаются по тем же свечам, поэтому ключа свечей достаточно
+    key = (symbol, frame_key)
+    if st.session_state.get(f"analysis_chart_key_{symbol}") == key:
+        return st.session_state[f"analysis_chart_{symbol}"]
+    
     fig = go.Figure()
     
-    # Candlestick chart
+    # Candlestick chart (float32 и секундные метки времени сокращают JSON для браузера)
     fig.add_trace(go.Candlestick(
-        x=df['timestamp'],
-        open=df['open'],
-        high=df['high'],
-        low=df['low'],
-        close=df['close'],
+        x=df['timestamp'].to_numpy(dtype='datetime64[s]'),
+        open=_f32(df['open']),
+        high=_f32(df['high']),
+        low=_f32(df['low']),
+        close=_f32(df['close']),
         name='Price'
     ))
     
@@ -454,34 +492,41 @@ def create_comprehensive_chart(df, symbol, fib_levels):
     fib_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
     fib_labels = ['0.0 (Max)', '23.6%', '38.2%', '50%', '61.8%', '78.6%', '100% (Min)']
     
+    # Линии и подписи собираем списками и передаем в layout одним вызовом
+    shapes = []
+    annotations = []
     for i, (level, price) in enumerate(fib_levels.items()):
-        fig.add_hline(
-            y=price, 
-            line_dash="solid" if level in ['0.0', '0.5', '1.0'] else "dash",
-            line_color=fib_colors[i],
-            line_width=3 if level in ['0.0', '0.5', '1.0'] else 2,
-            annotation_text=f"Fib {fib_labels[i]}", 
-            annotation_position="right",
-            annotation_font_size=12,
-            annotation_font_color=fib_colors[i],
+        key_level = level in ['0.0', '0.5', '1.0']
+        shapes.append(dict(
+            type='line', xref='x domain', yref='y', x0=0, x1=1, y0=price, y1=price,
+            line=dict(color=fib_colors[i], width=3 if key_level else 2, dash="solid" if key_level else "dash"),
             opacity=0.8
-        )
+        ))
+        annotations.append(dict(
+            xref='x domain', yref='y', x=1, y=price,
+            xanchor='left', yanchor='middle', showarrow=False,
+            text=f"Fib {fib_labels[i]}",
+            font=dict(size=12, color=fib_colors[i])
+        ))
     
     # Добавляем зоны между ключевыми уровнями Фибоначчи
     key_levels = ['0.0', '0.236', '0.382', '0.5', '0.618', '0.786', '1.0']
     for i in range(len(key_levels)-1):
         if key_levels[i] in fib_levels and key_levels[i+1] in fib_levels:
-            fig.add_hrect(
+            shapes.append(dict(
+                type='rect', xref='x domain', yref='y', x0=0, x1=1,
                 y0=fib_levels[key_levels[i+1]], 
                 y1=fib_levels[key_levels[i]], 
                 fillcolor=fib_colors[i], 
                 opacity=0.1,
-                line_width=0,
+                line=dict(width=0),
                 name=f"Zone {key_levels[i]}-{key_levels[i+1]}"
-            )
+            ))
     
     fig.update_layout(
         title=f'{symbol} - Price Chart with Fibonacci Levels (48 hours, 15m timeframe)',
+        shapes=shapes,
+        annotations=annotations,
         xaxis_title='Time',
         yaxis_title='Price (USDT)',
         height=600,
@@ -494,74 +539,92 @@ def create_comprehensive_chart(df, symbol, fib_levels):
         )
     )
     
+    st.session_state[f"analysis_chart_key_{symbol}"] = key
+    st.session_state[f"analysis_chart_{symbol}"] = fig
     return fig
 
+def create_sentiment_chart(sentiment_analysis):
+    """Столбчатый график распределения сентимента новостей"""
+    values = [sentiment_analysis['positive'], sentiment_analysis['neutral'], sentiment_analysis['negative']]
+    
+    # Перестраиваем фигуру только при изменении распределения, иначе берем из session_state
+    key = tuple(values)
+    if st.session_state.get("sentiment_fig_key") == key:
+        return st.session_state["sentiment_fig"]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=['positive', 'neutral', 'negative'],
+        y=values,
+        marker_color=['green', 'gray', 'red'],
+        text=values,
+        textposition='auto',
+    ))
+    fig.update_layout(
+        title='Распределение сентимента новостей',
+        height=300
+    )
+    
+    st.session_state["sentiment_fig_key"] = key
+    st.session_state["sentiment_fig"] = fig
+    return fig
+
+# Сообщения сигналов по направлению индикатора (1, 0, -1); None - сигнал не выводится
+RECOMMENDATION_SIGNALS = {
+    'rsi': {
+        1: "🟢 RSI указывает на перепроданность - потенциал роста",
+        0: "⚪ RSI в нейтральной зоне",
+        -1: "🔴 RSI указывает на перекупленность - риск снижения"
+    },
+    'macd': {
+        1: "🟢 MACD дает бычий сигнал",
+        0: None,
+        -1: "🔴 MACD дает медвежий сигнал"
+    },
+    'stochastic': {
+        1: "🟢 Stochastic указывает на перепроданность",
+        0: None,
+        -1: "🔴 Stochastic указывает на перекупленность"
+    },
+    'trend': {
+        1: "🟢 Восходящий тренд подтвержден",
+        0: None,
+        -1: "🔴 Нисходящий тренд подтвержден"
+    },
+    'news': {
+        1: "🟢 Положительный новостной фон",
+        0: "⚪ Нейтральный новостной фон",
+        -1: "🔴 Негативный новостной фон"
+    }
+}
+
+# Рекомендации от продажи к покупке и нижние границы оценки для каждой, кроме первой
+RECOMMENDATION_LEVELS = (
+    ("🔴 СИГНАЛ К ПРОДАЖЕ", "Большинство индикаторов показывают отрицательную динамику"),
+    ("📉 УМЕРЕННО-ОТРИЦАТЕЛЬНЫЙ", "Преобладают отрицательные сигналы"),
+    ("⚪ НЕЙТРАЛЬНЫЙ", "Сигналы противоречивы"),
+    ("📈 УМЕРЕННО-ПОЛОЖИТЕЛЬНЫЙ", "Преобладают положительные сигналы"),
+    ("🟢 СИГНАЛ К ПОКУПКЕ", "Большинство индикаторов показывают положительную динамику")
+)
+RECOMMENDATION_THRESHOLDS = (30, 45, 55, 70)
+
 def generate_trading_recommendation(explanations, current_data, news_sentiment):
     """Генерация торговых рекомендаций на основе всех индикаторов"""
+    # Новостной фон оценивается как еще один индикатор
+    news_score = news_sentiment.get('news_score', 0)
+    directions = {key: info['direction'] for key, info in explanations.items() if 'direction' in info}
+    directions['news'] = int(news_score > 10) - int(news_score < -10)
+    
+    # Бычий сигнал дает 1 балл, нейтральный 0.5, медвежий 0
     signals = []
     score = 0
     max_score = 0
-    
-    # RSI анализ
-    rsi_info = explanations.get('rsi', {})
-    if 'interpretation' in rsi_info:
-        max_score += 1
-        if "ПЕРЕПРОДАННОСТЬ" in rsi_info['interpretation']:
-            score += 1
-            signals.append("🟢 RSI указывает на перепроданность - потенциал роста")
-        elif "ПЕРЕКУПЛЕННОСТЬ" in rsi_info['interpretation']:
-            signals.append("🔴 RSI указывает на перекупленность - риск снижения")
-        else:
-            score += 0.5
-            signals.append("⚪ RSI в нейтральной зоне")
-    
-    # MACD анализ
-    macd_info = explanations.get('macd', {})
-    if 'interpretation' in macd_info:
-        max_score += 1
-        if "БЫЧИЙ" in macd_info['interpretation']:
-            score += 1
-            signals.append("🟢 MACD дает бычий сигнал")
-        elif "МЕДВЕЖИЙ" in macd_info['interpretation']:
-            signals.append("🔴 MACD дает медвежий сигнал")
-        else:
-            score += 0.5
-    
-    # Stochastic анализ
-    stoch_info = explanations.get('stochastic', {})
-    if 'interpretation' in stoch_info:
-        max_score += 1
-        if "ПЕРЕПРОДАННОСТЬ" in stoch_info['interpretation']:
-            score += 1
-            signals.append("🟢 Stochastic указывает на перепроданность")
-        elif "ПЕРЕКУПЛЕННОСТЬ" in stoch_info['interpretation']:
-            signals.append("🔴 Stochastic указывает на перекупленность")
-        else:
-            score += 0.5
-    
-    # Тренд анализ
-    trend_info = explanations.get('trend', {})
-    if 'interpretation' in trend_info:
-        max_score += 1
-        if "ВОСХОДЯЩИЙ" in trend_info['interpretation']:
-            score += 1
-            signals.append("🟢 Восходящий тренд подтвержден")
-        elif "НИСХОДЯЩИЙ" in trend_info['interpretation']:
-            signals.append("🔴 Нисходящий тренд подтвержден")
-        else:
-            score += 0.5
-    
-    # Новостной анализ
-    news_score = news_sentiment.get('news_score', 0)
-    max_score += 1
-    if news_score > 10:
-        score += 1
-        signals.append("🟢 Положительный новостной фон")
-    elif news_score < -10:
-        signals.append("🔴 Негативный новостной фон")
-    else:
-        score += 0.5
-        signals.append("⚪ Нейтральный новостной фон")
+    for key, messages in RECOMMENDATION_SIGNALS.items():
+        if key in directions:
+            max_score += 1
+            score += (directions[key] + 1) / 2
+            if messages[directions[key]]:
+                signals.append(messages[directions[key]])
     
     # Общая оценка
     if max_score > 0:
@@ -573,21 +636,7 @@ def generate_trading_recommendation(explanations, current_data, news_sentiment):
     total_score = total_score * 0.8 + news_score * 0.2
     
     # Формирование рекомендации
-    if total_score >= 70:
-        recommendation = "🟢 СИГНАЛ К ПОКУПКЕ"
-        reasoning = "Большинство индикаторов показывают положительную динамику"
-    elif total_score >= 55:
-        recommendation = "📈 УМЕРЕННО-ПОЛОЖИТЕЛЬНЫЙ"
-        reasoning = "Преобладают положительные сигналы"
-    elif total_score >= 45:
-        recommendation = "⚪ НЕЙТРАЛЬНЫЙ"
-        reasoning = "Сигналы противоречивы"
-    elif total_score >= 30:
-        recommendation = "📉 УМЕРЕННО-ОТРИЦАТЕЛЬНЫЙ"
-        reasoning = "Преобладают отрицательные сигналы"
-    else:
-        recommendation = "🔴 СИГНАЛ К ПРОДАЖЕ"
-        reasoning = "Большинство индикаторов показывают отрицательную динамику"
+    recommendation, reasoning = RECOMMENDATION_LEVELS[sum(int(total_score >= t) for t in RECOMMENDATION_THRESHOLDS)]
     
     # Учет новостного фона
     if news_score > 20:
@@ -602,267 +651,337 @@ def generate_trading_recommendation(explanations, current_data, news_sentiment):
         'reasoning': reasoning
     }
 
-def main():
-    st.title("🔍 Детальный анализ криптовалют")
-    
-    # Автообновление
-    if 'analysis_update_time' not in st.session_state:
-        st.session_state.analysis_update_time = time.time()
-    
-    auto_refresh = st.sidebar.checkbox("🔄 Автообновление каждые 60 секунд", value=True)
-    
-    if auto_refresh:
-        current_time = time.time()
-        if current_time - st.session_state.analysis_update_time > 60:
-            st.session_state.analysis_update_time = current_time
-            st.rerun()
+# Разделы детального анализа
+ANALYSIS_SECTIONS = ("Технический анализ", "Объемный анализ", "Прогноз и рекомендации", "Итоговый анализ")
+
+# Краткосрочный прогноз по общей оценке: (тип уведомления, вывод, детали) от снижения к росту
+SHORT_TERM_FORECASTS = (
+    ('error', "🔴 ВЕРОЯТНО СНИЖЕНИЕ - Рассмотрите возможность продажи", "**Цели:** -1-3% от текущей цены  \n**Стоп-лосс:** +1.5% от текущей цены"),
+    ('info', "⚪ БОКОВОЕ ДВИЖЕНИЕ - Рекомендуется выжидательная позиция", None),
+    ('success', "🟢 ВЕРОЯТЕН РОСТ - Рассмотрите возможность покупки", "**Цели:** +1-3% от текущей цены  \n**Стоп-лосс:** -1.5% от текущей цены")
+)
+
+# Долгосрочный прогноз по изменению цены за 24 часа, в том же порядке
+LONG_TERM_FORECASTS = (
+    ('error', "📉 СИЛЬНЫЙ НИСХОДЯЩИЙ ТРЕНД - Риск дальнейшего снижения", "**Цели на 30 дней:** -10-20%"),
+    ('info', "⚪ СТАБИЛЬНАЯ ДИНАМИКА - Умеренные ожидания", None),
+    ('success', "📈 СИЛЬНЫЙ ВОСХОДЯЩИЙ ТРЕНД - Перспектива роста сохраняется", "**Цели на 30 дней:** +15-25%")
+)
+
+def render_forecast(forecast):
+    """Вывод прогноза: цветное уведомление и детали под ним"""
+    kind, message, details = forecast
+    getattr(st, kind)(message)
+    if details:
+        st.markdown(details)
+
+# Тексты итогового анализа: блоки колонки разделены абзацем и уходят одним markdown
+SUMMARY_STRENGTHS_BULLISH = (
+    "• Несколько индикаторов подтверждают восходящий тренд",
+    "• Объемы торгов поддерживают движение",
+    "• Техническая картина выглядит устойчивой"
+)
+SUMMARY_STRENGTHS_DEFAULT = (
+    "• Возможность для входа на развороте",
+    "• Потенциал для среднесрочной торговли"
+)
+SUMMARY_HIGH_RISK_LEVELS = ('Высокий', 'Очень высокий', 'Экстремально высокий')
+SUMMARY_RISKS_HIGH = (
+    "• Высокая волатильность актива",
+    "• Ограниченная ликвидность",
+    "• Сильная зависимость от новостного фона"
+)
+SUMMARY_RISKS_DEFAULT = ("• Общие рыночные риски", "• Внешние факторы влияния")
+SUMMARY_ADVICE = "  \n".join([
+    "**💡 Рекомендации:**",
+    "• Соблюдайте риск-менеджмент",
+    "• Используйте стоп-лосс ордера",
+    "• Мониторьте рыночные новости"
+])
+
+def summary_markdown(score, news_score, risk, fib_min, fib_max):
+    """Markdown двух колонок итогового анализа: сильные стороны с уровнями и риски с рекомендациями"""
+    if score >= 60:
+        strengths = list(SUMMARY_STRENGTHS_BULLISH)
+        if news_score > 0:
+            strengths.append("• Положительный новостной фон")
+    else:
+        strengths = list(SUMMARY_STRENGTHS_DEFAULT)
+    risks = SUMMARY_RISKS_HIGH if risk in SUMMARY_HIGH_RISK_LEVELS else SUMMARY_RISKS_DEFAULT
     
-    selected_symbol = st.selectbox(
-        "Выберите криптовалютную пару для анализа:",
-        [pair.replace('_', '/') for pair in CRYPTO_PAIRS]
-    )
+    strengths_md = "\n\n".join([
+        "  \n".join(["**✅ Сильные стороны:**", *strengths]),
+        "  \n".join([
+            "**🎯 Ключевые уровни:**",
+            f"• **Поддержка:** ${fib_min:.6f}",
+            f"• **Сопротивление:** ${fib_max:.6f}"
+        ])
+    ])
+    risks_md = "\n\n".join(["  \n".join(["**⚠️ Риски:**", *risks]), SUMMARY_ADVICE])
+    return strengths_md, risks_md
+
+def render_analysis(selected_symbol):
+    """Загрузка данных и вывод аналитики по выбранной паре"""
+    api_symbol = API_PAIRS[selected_symbol]
     
-    if selected_symbol:
-        api_symbol = selected_symbol.replace('/', '_')
-        
-        with st.spinner("Загрузка данных и расчет аналитики..."):
-            # Получаем текущие данные
-            current_data = get_gateio_data(api_symbol)
-            # Получаем актуальные данные тикера
-            ticker_data = fetch_gateio_ticker(api_symbol)
-            # Получаем исторические данные (48 часов, 15-минутный таймфрейм)
-            historical_data = fetch_gateio_klines(api_symbol, '15m', 192)
-            # Получаем новости для выбранной пары
-            news_items = get_cryptopanic_news(api_symbol, "all")
+    with st.spinner("Загрузка данных и расчет аналитики..."):
+        # Получаем текущие данные - по ним видно, торгуется ли пара вообще
+        current_data = get_gateio_data(api_symbol)
+        if not current_data['available']:
+            st.error("❌ Недостаточно данных для комплексного анализа")
+            if current_data.get('error'):
+                st.error(current_data['error'])
+            st.info("💡 Эта криптовалютная пара не торгуется на бирже Gate.io")
+            historical_data = ticker_data = None
+        else:
+            # Свечи и новости нужны только для торгуемой пары, запрашиваем их параллельно
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Получаем исторические данные (48 часов, 15-минутный таймфрейм)
+                klines_future = executor.submit(fetch_gateio_klines, api_symbol, '15m', 192)
+                # Получаем новости для выбранной пары
+                news_future = executor.submit(get_cryptopanic_news, api_symbol, "all")
+                # Новости остальных пар прогреваются в фоне и не задерживают вывод
+                _prewarm_news(api_symbol)
+                
+                news_items, news_error = news_future.result()
+            
+            # Ошибки загрузки выводятся в потоке скрипта: st.error из рабочего потока не виден
+            try:
+                historical_data = klines_future.result()
+            except Exception as e:
+                historical_data = None
+                st.error(f"Ошибка получения исторических данных для {api_symbol}: {e}")
+            if news_error:
+                st.error(news_error)
+            # Актуальные данные тикера берутся из уже загруженного общего запроса тикеров
+            ticker_data, ticker_error = fetch_gateio_ticker(api_symbol)
+            if ticker_error:
+                st.error(ticker_error)
             # Анализируем сентимент новостей
             sentiment_analysis = analyze_news_sentiment(news_items)
             # Получаем специфическую информацию о криптовалюте
             crypto_info = get_crypto_specific_news(selected_symbol)
+        
+        if current_data['available'] and historical_data is not None and ticker_data:
+            # Расчет индикаторов
+            # Один ключ свечей на прогон: им же ключуется кэш графика
+            frame_key = _frame_key(api_symbol, historical_data)
+            df, explanations = calculate_technical_indicators(frame_key, historical_data)
+            current_price = current_data['last']
             
-            if current_data['available'] and historical_data is not None and ticker_data:
-                # Расчет индикаторов
-                df, explanations = calculate_technical_indicators(historical_data)
-                current_price = current_data['last']
-                
-                # Расчет уровней Фибоначчи
-                fib_levels = calculate_fibonacci_levels(df)
-                
-                # Генерация рекомендаций
-                recommendation = generate_trading_recommendation(explanations, current_data, sentiment_analysis)
-                
-                # ОСНОВНЫЕ МЕТРИКИ - ИСПРАВЛЕННЫЕ С РЕАЛЬНЫМИ ДАННЫМИ
-                st.subheader("📊 Основные метрики (реальные данные Gate.io API)")
-                col1, col2, col3, col4, col5, col6 = st.columns(6)
-                
-                with col1:
-                    st.metric("Текущая цена", f"${current_price:.6f}")
-                
-                with col2:
-                    # Используем реальные данные из ticker_data
-                    high_24h = float(ticker_data.get('high_24h', current_data.get('high_24h', 0)))
-                    st.metric("Максимум 24ч", f"${high_24h:.6f}")
-                
-                with col3:
-                    # Используем реальные данные из ticker_data
-                    low_24h = float(ticker_data.get('low_24h', current_data.get('low_24h', 0)))
-                    st.metric("Минимум 24ч", f"${low_24h:.6f}")
-                
-                with col4:
-                    # Используем реальные данные об объеме
-                    quote_volume = float(ticker_data.get('quote_volume', current_data.get('quote_volume', 0)))
-                    st.metric("Объем 24ч", f"${quote_volume:,.0f}")
-                
-                with col5:
-                    change_percentage = current_data.get('change_percentage', 0)
-                    st.metric(
-                        "Изменение 24ч", 
-                        f"{change_percentage:.2f}%",
-                        delta=f"{change_percentage:.2f}%"
-                    )
-                
-                with col6:
-                    # Расчет изменения цены за 24ч в абсолютных значениях
-                    change_24h = current_price - (current_price / (1 + change_percentage/100))
-                    st.metric("Изменение цены 24ч", f"${change_24h:+.6f}")
-                
-                # ИНФОРМАЦИЯ О КРИПТОВАЛЮТЕ - ОБНОВЛЕННАЯ
-                st.subheader("📋 Информация о криптовалюте")
-                info_col1, info_col2 = st.columns(2)
+            # Расчет уровней Фибоначчи
+            fib_levels = calculate_fibonacci_levels(df)
+            
+            # Генерация рекомендаций
+            recommendation = generate_trading_recommendation(explanations, current_data, sentiment_analysis)
+            
+            # ОСНОВНЫЕ МЕТРИКИ - ИСПРАВЛЕННЫЕ С РЕАЛЬНЫМИ ДАННЫМИ
+            st.subheader("📊 Основные метрики (реальные данные Gate.io API)")
+            # Используем реальные данные из ticker_data, при их отсутствии - из общего тикера
+            high_24h = float(ticker_data.get('high_24h', current_data.get('high_24h', 0)))
+            low_24h = float(ticker_data.get('low_24h', current_data.get('low_24h', 0)))
+            quote_volume = float(ticker_data.get('quote_volume', current_data.get('quote_volume', 0)))
+            change_percentage = current_data.get('change_percentage', 0)
+            # Расчет изменения цены за 24ч в абсолютных значениях
+            change_24h = current_price - (current_price / (1 + change_percentage/100))
+            change_text = f"{change_percentage:.2f}%"
+            
+            # Метрики одной строкой колонок: (заголовок, значение, дельта)
+            metrics = (
+                ("Текущая цена", f"${current_price:.6f}", None),
+                ("Максимум 24ч", f"${high_24h:.6f}", None),
+                ("Минимум 24ч", f"${low_24h:.6f}", None),
+                ("Объем 24ч", f"${quote_volume:,.0f}", None),
+                ("Изменение 24ч", change_text, change_text),
+                ("Изменение цены 24ч", f"${change_24h:+.6f}", None)
+            )
+            for col, (label, value, delta) in zip(st.columns(len(metrics)), metrics):
+                col.metric(label, value, delta=delta)
+            
+            # ИНФОРМАЦИЯ О КРИПТОВАЛЮТЕ - ОБНОВЛЕННАЯ
+            st.subheader("📋 Информация о криптовалюте")
+            info_col1, info_col2 = st.columns(2)
+            
+            # Строки колонки выводятся одним markdown-блоком (два пробела + перевод строки = разрыв строки)
+            with info_col1:
+                st.markdown("  \n".join([
+                    f"**Название:** {crypto_info.get('name', 'Неизвестно')}",
+                    f"**Описание:** {crypto_info.get('description', 'Нет описания')}",
+                    f"**Текущая цена:** ${current_price:.6f}",
+                    f"**Объем 24ч:** ${quote_volume:,.0f}"
+                ]))
                 
-                with info_col1:
-                    st.write(f"**Название:** {crypto_info.get('name', 'Неизвестно')}")
-                    st.write(f"**Описание:** {crypto_info.get('description', 'Нет описания')}")
-                    st.write(f"**Текущая цена:** ${current_price:.6f}")
-                    st.write(f"**Объем 24ч:** ${quote_volume:,.0f}")
+            with info_col2:
+                st.markdown("  \n".join([
+                    f"**Рыночный сентимент:** {crypto_info.get('sentiment', 'Неизвестно')}",
+                    f"**Уровень риска:** {crypto_info.get('risk', 'Неизвестно')}",
+                    f"**Диапазон 24ч:** ${low_24h:.6f} - ${high_24h:.6f}",
+                    f"**Мониторинг каналов:** {', '.join(crypto_info.get('channels', []))}"
+                ]))
+            
+            # 📰 РАЗДЕЛ НОВОСТНОГО АНАЛИЗА
+            st.subheader("📰 Новостной анализ и сентимент")
+            
+            # Создаем колонки для сентимента и ключевой информации
+            news_col1, news_col2 = st.columns(2)
+            
+            with news_col1:
+                st.markdown("##### 📊 Анализ сентимента новостей")
+                if sentiment_analysis['total'] > 0:
+                    # Визуализация сентимента
+                    fig_sentiment = create_sentiment_chart(sentiment_analysis)
+                    st.plotly_chart(fig_sentiment, use_container_width=True)
+                    
+                    # Общая оценка сентимента
+                    st.metric("Общий сентимент новостей", f"{sentiment_analysis['news_score']:.1f}%")
                     
-                with info_col2:
-                    st.write(f"**Рыночный сентимент:** {crypto_info.get('sentiment', 'Неизвестно')}")
-                    st.write(f"**Уровень риска:** {crypto_info.get('risk', 'Неизвестно')}")
-                    st.write(f"**Диапазон 24ч:** ${low_24h:.6f} - ${high_24h:.6f}")
-                    st.write(f"**Мониторинг каналов:** {', '.join(crypto_info.get('channels', []))}")
+                else:
+                    st.info("Новостные данные временно недоступны")
+            
+            with news_col2:
+                st.markdown("##### 🔑 Ключевые факторы влияния")
                 
-                # 📰 РАЗДЕЛ НОВОСТНОГО АНАЛИЗА
-                st.subheader("📰 Новостной анализ и сентимент")
+                st.markdown("  \n".join(["**Основные факторы:**"] + [f"• {factor}" for factor in crypto_info['key_factors']]))
                 
-                # Создаем колонки для сентимента и ключевой информации
-                news_col1, news_col2 = st.columns(2)
+                st.markdown("  \n".join(["**Последние тренды:**"] + [f"• {trend}" for trend in crypto_info['recent_trends']]))
+            
+            # ОТОБРАЖЕНИЕ ПОСЛЕДНИХ НОВОСТЕЙ
+            if news_items:
+                st.markdown("##### 📈 Последние важные новости")
                 
-                with news_col1:
-                    st.markdown("##### 📊 Анализ сентимента новостей")
-                    if sentiment_analysis['total'] > 0:
-                        # Визуализация сентимента
-                        fig_sentiment = go.Figure()
-                        sentiments = ['positive', 'neutral', 'negative']
-                        colors = ['green', 'gray', 'red']
-                        values = [sentiment_analysis['positive'], 
-                                 sentiment_analysis['neutral'], 
-                                 sentiment_analysis['negative']]
-                        
-                        fig_sentiment.add_trace(go.Bar(
-                            x=sentiments,
-                            y=values,
-                            marker_color=colors,
-                            text=values,
-                            textposition='auto',
-                        ))
-                        
-                        fig_sentiment.update_layout(
-                            title='Распределение сентимента новостей',
-                            height=300
-                        )
-                        st.plotly_chart(fig_sentiment, use_container_width=True)
-                        
-                        # Общая оценка сентимента
-                        st.metric("Общий сентимент новостей", f"{sentiment_analysis['news_score']:.1f}%")
-                        
-                    else:
-                        st.info("Новостные данные временно недоступны")
+                # Ограничиваем количество отображаемых новостей
+                display_news = news_items[:5]
                 
-                with news_col2:
-                    st.markdown("##### 🔑 Ключевые факторы влияния")
+                for i, news_item in enumerate(display_news, start=1):
+                    # Поля новости читаются один раз
+                    title = news_item.get('title', 'Без названия')
+                    url = news_item.get('url')
+                    created_at = news_item.get('created_at', 'Неизвестно')
+                    sentiment = news_item.get('sentiment', 'neutral')
+                    votes = news_item.get('votes') or {}
                     
-                    st.markdown("**Основные факторы:**")
-                    for factor in crypto_info['key_factors']:
-                        st.write(f"• {factor}")
-                    
-                    st.markdown("**Последние тренды:**")
-                    for trend in crypto_info['recent_trends']:
-                        st.write(f"• {trend}")
+                    with st.expander(f"{i}. {title}"):
+                        col1, col2 = st.columns([3, 1])
+                        # Тело новости - по одному markdown-блоку на колонку вместо отдельного элемента на строку
+                        with col1:
+                            news_lines = []
+                            if url:
+                                news_lines.append(f"**Источник:** [Перейти]({url})")
+                            news_lines.append(f"**Дата:** {created_at}")
+                            
+                            # Отображаем сентимент
+                            sentiment_color = SENTIMENT_EMOJI.get(sentiment, '⚪')
+                            
+                            news_lines.append(f"**Сентимент:** {sentiment_color} {sentiment}")
+                            st.markdown("  \n".join(news_lines))
+                            
+                        with col2:
+                            # Голоса и важность
+                            if votes:
+                                st.markdown("  \n".join([
+                                    f"👍 {votes.get('important', 0)}",
+                                    f"🐂 {votes.get('bullish', 0)}",
+                                    f"🐻 {votes.get('bearish', 0)}"
+                                ]))
+            
+            # ГРАФИК С УЛУЧШЕННЫМИ УРОВНЯМИ ФИБОНАЧЧИ
+            st.subheader("📈 График цены с уровнями Фибоначчи")
+            price_chart = create_comprehensive_chart(df, selected_symbol, fib_levels, frame_key)
+            if price_chart:
+                st.plotly_chart(price_chart, use_container_width=True)
                 
-                # ОТОБРАЖЕНИЕ ПОСЛЕДНИХ НОВОСТЕЙ
-                if news_items:
-                    st.markdown("##### 📈 Последние важные новости")
+                # Пояснение к уровням Фибоначчи
+                with st.expander("📖 О уровнях Фибоначчи"):
+                    st.markdown("""
+                    **Уровни Фибоначчи в трейдинге:**
                     
-                    # Ограничиваем количество отображаемых новостей
-                    display_news = news_items[:5]
-                    
-                    for i, news_item in enumerate(display_news):
-                        with st.expander(f"{i+1}. {news_item.get('title', 'Без названия')}"):
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                if news_item.get('url'):
-                                    st.write(f"**Источник:** [Перейти]({news_item['url']})")
-                                st.write(f"**Дата:** {news_item.get('created_at', 'Неизвестно')}")
-                                
-                                # Отображаем сентимент
-                                sentiment = news_item.get('sentiment', 'neutral')
-                                sentiment_color = {
-                                    'positive': '🟢',
-                                    'neutral': '⚪', 
-                                    'negative': '🔴'
-                                }.get(sentiment, '⚪')
-                                
-                                st.write(f"**Сентимент:** {sentiment_color} {sentiment}")
-                                
-                            with col2:
-                                # Голоса и важность
-                                votes = news_item.get('votes', {})
-                                if votes:
-                                    st.write(f"👍 {votes.get('important', 0)}")
-                                    st.write(f"🐂 {votes.get('bullish', 0)}")
-                                    st.write(f"🐻 {votes.get('bearish', 0)}")
-                
-                # ГРАФИК С УЛУЧШЕННЫМИ УРОВНЯМИ ФИБОНАЧЧИ
-                st.subheader("📈 График цены с уровнями Фибоначчи")
-                price_chart = create_comprehensive_chart(df, selected_symbol, fib_levels)
-                if price_chart:
-                    st.plotly_chart(price_chart, use_container_width=True)
+                    - **0.0% (Максимум)** - Наивысшая точка ценового движения
+                    - **23.6%** - Первый уровень коррекции
+                    - **38.2%** - Умеренный уровень коррекции
+                    - **50.0%** - Золотая середина, важный психологический уровень
+                    - **61.8%** - Золотое сечение, самый важный уровень Фибоначчи
+                    - **78.6%** - Глубокий уровень коррекции
+                    - **100.0% (Минимум)** - Наименьшая точка ценового движения
                     
-                    # Пояснение к уровням Фибоначчи
-                    with st.expander("📖 О уровнях Фибоначчи"):
-                        st.markdown("""
-                        **Уровни Фибоначчи в трейдинге:**
-                        
-                        - **0.0% (Максимум)** - Наивысшая точка ценового движения
-                        - **23.6%** - Первый уровень коррекции
-                        - **38.2%** - Умеренный уровень коррекции
-                        - **50.0%** - Золотая середина, важный психологический уровень
-                        - **61.8%** - Золотое сечение, самый важный уровень Фибоначчи
-                        - **78.6%** - Глубокий уровень коррекции
-                        - **100.0% (Минимум)** - Наименьшая точка ценового движения
-                        
-                        **Как использовать:**
-                        - Цена часто отскакивает от этих уровней
-                        - Уровни 38.2% и 61.8% считаются наиболее значимыми
-                        - При пробитии уровня 78.6% тренд может полностью развернуться
-                        """)
-                
-                # ДЕТАЛЬНЫЙ АНАЛИЗ ИНДИКАТОРОВ
-                st.subheader("🔍 Детальный анализ индикаторов")
-                
-                tab1, tab2, tab3, tab4 = st.tabs(["Технический анализ", "Объемный анализ", "Прогноз и рекомендации", "Итоговый анализ"])
+                    **Как использовать:**
+                    - Цена часто отскакивает от этих уровней
+                    - Уровни 38.2% и 61.8% считаются наиболее значимыми
+                    - При пробитии уровня 78.6% тренд может полностью развернуться
+                    """)
+            
+            # ДЕТАЛЬНЫЙ АНАЛИЗ ИНДИКАТОРОВ
+            st.subheader("🔍 Детальный анализ индикаторов")
+            
+            # Цены уровней Фибоначчи одним массивом: из него берутся отклонения и ключевые уровни
+            fib_prices = np.fromiter(fib_levels.values(), dtype=np.float64, count=len(fib_levels))
+            fib_min = float(fib_prices.min())
+            fib_max = float(fib_prices.max())
+            
+            # st.tabs выполняет и отправляет все четыре панели; радиокнопка рендерит только выбранную.
+            # Разделы - вложенный фрагмент: данные загружены и посчитаны выше, поэтому переключение
+            # раздела перезапускает только его вывод, а не запросы и расчет индикаторов
+            @st.fragment
+            def render_section():
+                section = st.radio(
+                    "Раздел анализа", ANALYSIS_SECTIONS,
+                    horizontal=True, label_visibility="collapsed", key="analysis_section"
+                )
                 
-                with tab1:
+                if section == ANALYSIS_SECTIONS[0]:
                     st.markdown("##### 📊 Технические индикаторы")
                     
                     if explanations:
                         for indicator, info in explanations.items():
                             with st.expander(f"{indicator.upper()} - {info.get('interpretation', '')}"):
-                                st.markdown(info.get('explanation', ''))
+                                st.markdown(render_explanation(indicator, info))
                     
                     # Уровни Фибоначчи
                     st.markdown("##### 📐 Уровни Фибоначчи")
                     fib_col1, fib_col2 = st.columns(2)
                     
+                    # Отклонение и статус для всех уровней одним векторным выражением
+                    fib_distances = (current_price / fib_prices - 1.0) * 100.0
+                    fib_support = current_price > fib_prices
+                    fib_markers = np.where(fib_support, "🟢", "🔴")
+                    fib_statuses = np.where(fib_support, "ПОДДЕРЖКА", "СОПРОТИВЛЕНИЕ")
+                    
+                    fib_lines = [
+                        f"{marker} **{level}:** ${price:.6f} ({distance_pct:+.1f}%) - {status}"
+                        for level, price, distance_pct, marker, status
+                        in zip(fib_levels, fib_prices, fib_distances, fib_markers, fib_statuses)
+                    ]
+                    
                     with fib_col1:
-                        for level, price in list(fib_levels.items())[:4]:
-                            distance_pct = ((current_price - price) / price) * 100
-                            status = "ПОДДЕРЖКА" if current_price > price else "СОПРОТИВЛЕНИЕ"
-                            color = "🟢" if status == "ПОДДЕРЖКА" else "🔴"
-                            st.write(f"{color} **{level}:** ${price:.6f} ({distance_pct:+.1f}%) - {status}")
+                        st.markdown("  \n".join(fib_lines[:4]))
                     
                     with fib_col2:
-                        for level, price in list(fib_levels.items())[4:]:
-                            distance_pct = ((current_price - price) / price) * 100
-                            status = "ПОДДЕРЖКА" if current_price > price else "СОПРОТИВЛЕНИЕ"
-                            color = "🟢" if status == "ПОДДЕРЖКА" else "🔴"
-                            st.write(f"{color} **{level}:** ${price:.6f} ({distance_pct:+.1f}%) - {status}")
+                        st.markdown("  \n".join(fib_lines[4:]))
                 
-                with tab2:
+                elif section == ANALYSIS_SECTIONS[1]:
                     st.markdown("##### 💰 Объемный анализ")
                     
-                    vol_col1, vol_col2 = st.columns(2)
+                    # Колонка volume есть всегда: по ней считаются индикаторы
+                    avg_volume = float(np.nanmean(df['volume'].to_numpy()))
+                    volume_ratio = quote_volume / avg_volume if avg_volume > 0 else 0
                     
-                    with vol_col1:
-                        st.write(f"**Текущий объем:** ${quote_volume:,.0f}")
-                        if 'volume' in df.columns:
-                            avg_volume = df['volume'].mean()
-                            st.write(f"**Средний объем 48ч:** ${avg_volume:,.0f}")
-                            volume_ratio = quote_volume / avg_volume if avg_volume > 0 else 0
-                            st.write(f"**Соотношение объемов:** {volume_ratio:.1f}x")
-                            
-                            if volume_ratio > 1.5:
-                                st.success("📈 Высокий объем - подтверждение тренда")
-                            elif volume_ratio < 0.7:
-                                st.warning("📉 Низкий объем - отсутствие подтверждения")
+                    # Числа - сеткой st.metric: фронтенд обновляет значения на месте
+                    vol_col1, vol_col2, vol_col3 = st.columns(3)
+                    vol_col1.metric("Текущий объем", f"${quote_volume:,.0f}")
+                    vol_col2.metric("Средний объем 48ч", f"${avg_volume:,.0f}")
+                    vol_col3.metric("Соотношение объемов", f"{volume_ratio:.1f}x")
+                    
+                    if volume_ratio > 1.5:
+                        st.success("📈 Высокий объем - подтверждение тренда")
+                    elif volume_ratio < 0.7:
+                        st.warning("📉 Низкий объем - отсутствие подтверждения")
                     
-                    with vol_col2:
-                        st.markdown("##### ⚡ Рыночная статистика")
-                        st.write(f"**Ценовой диапазон 24ч:** ${low_24h:.6f} - ${high_24h:.6f}")
-                        st.write(f"**Волатильность 24ч:** {((high_24h - low_24h) / current_price * 100):.2f}%")
-                        st.write(f"**Относительная сила:** {explanations.get('rsi', {}).get('value', 0):.1f}")
+                    st.markdown("##### ⚡ Рыночная статистика")
+                    stat_col1, stat_col2, stat_col3 = st.columns(3)
+                    stat_col1.metric("Ценовой диапазон 24ч", f"${low_24h:.6f} - ${high_24h:.6f}")
+                    stat_col2.metric("Волатильность 24ч", f"{((high_24h - low_24h) / current_price * 100):.2f}%")
+                    stat_col3.metric("Относительная сила", f"{explanations.get('rsi', {}).get('value', 0):.1f}")
                 
-                with tab3:
+                elif section == ANALYSIS_SECTIONS[2]:
                     st.markdown("##### 🎯 Прогноз и торговые рекомендации")
                     
                     # Отображение рекомендации
@@ -872,85 +991,66 @@ def main():
                     
                     # Сигналы
                     st.markdown("###### 📊 Сигналы индикаторов:")
-                    for signal in recommendation['signals']:
-                        st.write(signal)
+                    if recommendation['signals']:
+                        st.markdown("  \n".join(recommendation['signals']))
                     
                     # Краткосрочный прогноз
                     st.markdown("###### ⏱️ Краткосрочный прогноз (30-180 минут)")
-                    if recommendation['score'] >= 60:
-                        st.success("🟢 ВЕРОЯТЕН РОСТ - Рассмотрите возможность покупки")
-                        st.write("**Цели:** +1-3% от текущей цены")
-                        st.write("**Стоп-лосс:** -1.5% от текущей цены")
-                    elif recommendation['score'] <= 40:
-                        st.error("🔴 ВЕРОЯТНО СНИЖЕНИЕ - Рассмотрите возможность продажи")
-                        st.write("**Цели:** -1-3% от текущей цены")
-                        st.write("**Стоп-лосс:** +1.5% от текущей цены")
-                    else:
-                        st.info("⚪ БОКОВОЕ ДВИЖЕНИЕ - Рекомендуется выжидательная позиция")
+                    render_forecast(SHORT_TERM_FORECASTS[int(recommendation['score'] > 40) + int(recommendation['score'] >= 60)])
                     
                     # Долгосрочный прогноз
                     st.markdown("###### 📅 Долгосрочный прогноз (1-100 дней)")
-                    if change_percentage > 10:
-                        st.success("📈 СИЛЬНЫЙ ВОСХОДЯЩИЙ ТРЕНД - Перспектива роста сохраняется")
-                        st.write("**Цели на 30 дней:** +15-25%")
-                    elif change_percentage < -10:
-                        st.error("📉 СИЛЬНЫЙ НИСХОДЯЩИЙ ТРЕНД - Риск дальнейшего снижения")
-                        st.write("**Цели на 30 дней:** -10-20%")
-                    else:
-                        st.info("⚪ СТАБИЛЬНАЯ ДИНАМИКА - Умеренные ожидания")
+                    render_forecast(LONG_TERM_FORECASTS[int(change_percentage >= -10) + int(change_percentage > 10)])
                 
-                with tab4:
+                elif section == ANALYSIS_SECTIONS[3]:
                     st.markdown("##### 📋 Итоговый анализ и рекомендации")
                     
                     summary_col1, summary_col2 = st.columns(2)
-                    
-                    with summary_col1:
-                        st.markdown("**✅ Сильные стороны:**")
-                        if recommendation['score'] >= 60:
-                            st.write("• Несколько индикаторов подтверждают восходящий тренд")
-                            st.write("• Объемы торгов поддерживают движение")
-                            st.write("• Техническая картина выглядит устойчивой")
-                            if sentiment_analysis['news_score'] > 0:
-                                st.write("• Положительный новостной фон")
-                        else:
-                            st.write("• Возможность для входа на развороте")
-                            st.write("• Потенциал для среднесрочной торговли")
-                        
-                        st.markdown("**🎯 Ключевые уровни:**")
-                        st.write(f"• **Поддержка:** ${min(fib_levels.values()):.6f}")
-                        st.write(f"• **Сопротивление:** ${max(fib_levels.values()):.6f}")
-                    
-                    with summary_col2:
-                        st.markdown("**⚠️ Риски:**")
-                        if crypto_info.get('risk') in ['Высокий', 'Очень высокий', 'Экстремально высокий']:
-                            st.write("• Высокая волатильность актива")
-                            st.write("• Ограниченная ликвидность")
-                            st.write("• Сильная зависимость от новостного фона")
-                        else:
-                            st.write("• Общие рыночные риски")
-                            st.write("• Внешние факторы влияния")
-                        
-                        st.markdown("**💡 Рекомендации:**")
-                        st.write("• Соблюдайте риск-менеджмент")
-                        st.write("• Используйте стоп-лосс ордера")
-                        st.write("• Мониторьте рыночные новости")
-                
-                # ВРЕМЯ ОБНОВЛЕНИЯ
-                st.sidebar.markdown(f"**🕒 Анализ обновлен:** {datetime.now().strftime('%H:%M:%S')}")
-                
-            else:
-                st.error("❌ Недостаточно данных для комплексного анализа")
-                if not current_data['available']:
-                    st.info("💡 Эта криптовалютная пара не торгуется на бирже Gate.io")
-                elif historical_data is None:
-                    st.info("⏳ Исторические данные временно недоступны")
-                elif not ticker_data:
-                    st.info("⏳ Данные тикера временно недоступны")
-        
-        # Кнопка ручного обновления
-        if st.button("🔄 Обновить анализ"):
-            st.cache_data.clear()
-            st.rerun()
+                    strengths_md, risks_md = summary_markdown(
+                        recommendation['score'], sentiment_analysis['news_score'],
+                        crypto_info.get('risk'), fib_min, fib_max
+                    )
+                    summary_col1.markdown(strengths_md)
+                    summary_col2.markdown(risks_md)
+            
+            render_section()
+            
+            # ВРЕМЯ ОБНОВЛЕНИЯ (фрагмент не может писать в сайдбар, поэтому выводится под анализом)
+            st.markdown(f"**🕒 Анализ обновлен:** {datetime.now().strftime('%H:%M:%S')}")
+            
+        elif current_data['available']:
+            st.error("❌ Недостаточно данных для комплексного анализа")
+            if historical_data is None:
+                st.info("⏳ Исторические данные временно недоступны")
+            elif not ticker_data:
+                st.info("⏳ Данные тикера временно недоступны")
+    
+    # Кнопка ручного обновления внутри фрагмента: нажатие перезапускает только анализ.
+    # Кэши сбрасываются в колбэке до перезапуска, поэтому анализ строится один раз
+    st.button("🔄 Обновить анализ", on_click=refresh_market_data)
+
+def refresh_market_data():
+    """Сброс рыночных данных и новостей; индикаторы кэшируются по содержимому свечей"""
+    clear_market_data_cache()
+    fetch_gateio_ticker.clear()
+    get_cryptopanic_news.clear()
+    # Сохраненные на диске новости остаются запасным ответом, но уже не считаются свежими
+    _news_refresh_state()['refreshed_at'] = time.time()
+
+def main():
+    st.title("🔍 Детальный анализ криптовалют")
+    
+    # Автообновление
+    auto_refresh = st.sidebar.checkbox("🔄 Автообновление каждые 60 секунд", value=True)
+    
+    selected_symbol = st.selectbox(
+        "Выберите криптовалютную пару для анализа:",
+        DISPLAY_PAIRS
+    )
+    
+    if selected_symbol:
+        # Раз в 60 секунд перезапускается только фрагмент с анализом, а не вся страница
+        st.fragment(render_analysis, run_every=60 if auto_refresh else None)(selected_symbol)
 
 if __name__ == "__main__":
     main()